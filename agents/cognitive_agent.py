@@ -5,17 +5,31 @@ from core.brain_layers import BabyBrain
 from core.memory_system import MemorySystem
 from core.learning_engine import LearningEngine
 from core.personality import Personality
+from core.event_log import EventLog
+from core.checkpoint_manager import CheckpointManager, frozen_parameters, load_checkpoint
 
 class CognitiveAgent:
-    def __init__(self, state_path: Optional[Union[str, Path]] = None):
+    def __init__(self, state_path: Optional[Union[str, Path]] = None,
+                 journal_name: Optional[str] = "personality"):
         self.brain = BabyBrain()
         self.memory = MemorySystem()
         self.learning = LearningEngine(self.brain, self.memory)
-        self.personality = Personality()
+        self.checkpoints = CheckpointManager(frozen=frozen_parameters(self.brain))
         
-        # Load previous state if path provided
-        if state_path:
-            self.load_state(state_path)
+        # Personality persists as a journal of updates: snapshot + replay on restart
+        self.personality_journal = EventLog(journal_name) if journal_name else None
+        if self.personality_journal is not None:
+            self.personality = Personality.restore(self.personality_journal)
+        else:
+            self.personality = Personality()
+        
+        # Resume from the saved state or the newest periodic checkpoint, whichever is more recent
+        candidates = [
+            Path(path) for path in (state_path, self.checkpoints.latest_path())
+            if path and Path(path).exists()
+        ]
+        if candidates:
+            self.load_state(max(candidates, key=lambda path: path.stat().st_mtime))
     
     def load_state(self, state_path: str | Path) -> bool:
         """
@@ -23,14 +37,28 @@ class CognitiveAgent:
         Returns True if successful, False otherwise
         """
         try:
-            state_dict = torch.load(str(state_path))
+            state_dict = load_checkpoint(state_path)
             self.brain.load_state_dict(state_dict['brain'])
-            self.personality = state_dict['personality']
+            personality = state_dict.get('personality')
+            if personality is not None:
+                self._adopt_personality(personality)
             return True
         except Exception as e:
             print(f"Failed to load state: {e}")
             return False
     
+    def _adopt_personality(self, personality: Personality) -> None:
+        """Take a checkpointed personality unless the journal already holds newer state"""
+        journal = self.personality_journal
+        if journal is None:
+            self.personality = personality
+            return
+        snapshot, events = journal.load()
+        if snapshot is None and not events:
+            personality.attach_journal(journal)
+            journal.snapshot(personality.to_dict())
+            self.personality = personality
+    
     def save_state(self, state_path: Union[str, Path]) -> None:
         """Save current brain state to the specified path"""
         state_dict = {
@@ -99,7 +127,10 @@ class CognitiveAgent:
         # Evolve personality based on accumulated experience
         if self.personality.learning_iterations % 100 == 0:
             self.personality.evolve_personality()
-            self.save_state(Path('data/brain_state/latest.pth'))
+            # Written on the checkpoint thread so feedback latency is unaffected;
+            # a journaled personality is already on disk and is left out
+            extra = {} if self.personality_journal else {'personality': self.personality}
+            self.checkpoints.save(self.brain.state_dict(), **extra)
     
     def get_personality_state(self):
         """Get current personality state"""
@@ -108,7 +139,7 @@ class CognitiveAgent:
     def rest(self):
         """Allow the agent to rest and recover energy"""
         recovery = 0.1
-        self.personality.energy = min(1.0, self.personality.energy + recovery)
+        self.personality.recover_energy(recovery)
         
         # Process memories during rest
         recent_memories = self.memory.recall_by_type('experience', limit=5)
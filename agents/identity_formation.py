@@ -19,9 +19,46 @@ class IdentityFormation:
         self.identity_strength = 0.0  # 0-1 scale
         self.learning_rate = 0.1
         
+        # Optional EventLog journaling every interaction
+        self.journal = None
+        
         # Initialize basic traits
         self._initialize_identity()
     
+    def attach_journal(self, journal, personality_journal=None):
+        """Journal subsequent identity (and optionally personality) updates"""
+        self.journal = journal
+        if personality_journal is not None:
+            self.personality.attach_journal(personality_journal)
+    
+    @classmethod
+    def restore(cls, journal, personality_journal=None):
+        """Rebuild identity from its journal's snapshot and the interactions after it"""
+        identity = cls()
+        snapshot, events = journal.load()
+        if snapshot:
+            identity.self_concept = snapshot['state']['self_concept']
+            identity.identity_strength = snapshot['state']['identity_strength']
+        for event in events:
+            identity._apply_interaction(event, event['pattern_count'])
+        
+        if personality_journal is not None:
+            identity.personality = Personality.restore(personality_journal)
+        identity.journal = journal
+        return identity
+    
+    def to_dict(self):
+        return {
+            'self_concept': self.self_concept,
+            'identity_strength': float(self.identity_strength)
+        }
+    
+    def __getstate__(self):
+        # The journal holds an open file; it is reattached after loading
+        state = self.__dict__.copy()
+        state['journal'] = None
+        return state
+    
     def _initialize_identity(self):
         """Initialize basic identity traits"""
         # Core traits from personality
@@ -50,10 +87,24 @@ class IdentityFormation:
         # Extract relevant information
         response = interaction_data.get('response', '')
         feedback = interaction_data.get('feedback', 0)
+        
+        # Analyze response patterns
+        pattern_count = len(self.pattern_recognition.recognize_patterns(response))
+        
+        self._apply_interaction(interaction_data, pattern_count)
+        self._record_interaction(interaction_data, pattern_count)
+        
+        # Update personality
+        self.personality.update_mood(feedback)
+        self.personality.evolve_personality()
+    
+    def _apply_interaction(self, interaction_data, pattern_count):
+        """Identity updates for one interaction (the personality is updated separately)"""
+        feedback = interaction_data.get('feedback', 0)
         context = interaction_data.get('context', '')
         
         # Update traits based on behavior
-        self._update_traits(response, feedback)
+        self._update_traits(pattern_count, feedback)
         
         # Update preferences based on success
         self._update_preferences(interaction_data)
@@ -67,21 +118,33 @@ class IdentityFormation:
         
         # Update identity strength
         self._update_identity_strength()
+    
+    def _record_interaction(self, interaction_data, pattern_count):
+        """Journal just what replaying an interaction needs"""
+        if self.journal is None:
+            return
         
-        # Update personality
-        self.personality.update_mood(feedback)
-        self.personality.evolve_personality()
+        feedback = interaction_data.get('feedback', 0)
+        event = {
+            'pattern_count': pattern_count,
+            'feedback': feedback,
+            'context': interaction_data.get('context', '')
+        }
+        if 'learning_type' in interaction_data:
+            event['learning_type'] = interaction_data['learning_type']
+        if abs(feedback) > 0.7:  # Stored as a memory
+            event['response'] = interaction_data.get('response', '')
+        
+        if self.journal.append('interaction', **event):
+            self.journal.snapshot(self.to_dict())
     
-    def _update_traits(self, response, feedback):
+    def _update_traits(self, pattern_count, feedback):
         """Update identity traits based on behavior"""
-        # Analyze response patterns
-        patterns = self.pattern_recognition.recognize_patterns(response)
-        
         # Update traits based on observed behavior and feedback
         for trait, value in self.self_concept['traits'].items():
             if trait == 'curiosity':
                 # Adjust curiosity based on response novelty
-                novelty = len(patterns) == 0
+                novelty = pattern_count == 0
                 self.self_concept['traits'][trait] = (
                     value * (1 - self.learning_rate) +
                     self.learning_rate * (1.0 if novelty else 0.0)
@@ -97,7 +160,7 @@ class IdentityFormation:
             
             elif trait == 'learning_eagerness':
                 # Adjust learning eagerness based on pattern recognition
-                eagerness = len(patterns) > 0
+                eagerness = pattern_count > 0
                 self.self_concept['traits'][trait] = (
                     value * (1 - self.learning_rate) +
                     self.learning_rate * (1.0 if eagerness else 0.0)
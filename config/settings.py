@@ -39,6 +39,8 @@ EARLY_STOPPING_PATIENCE = 5
 TRANSFORMER_MODEL = "gpt2"
 WHISPER_MODEL = "base"
 MODEL_CHECKPOINT_DIR = str(BRAIN_STATE_DIR / "checkpoints")
+CHECKPOINT_KEEP = 5  # Rotating checkpoints kept on disk
+CHECKPOINT_FULL_INTERVAL = 10  # Every Nth checkpoint is full, the rest are deltas
 
 # Memory system settings
 REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
@@ -49,6 +51,18 @@ SQLITE_DB = DATABASE_PATH  # For backward compatibility
 MAX_MEMORY_SIZE = 10000
 MEMORY_PRUNING_THRESHOLD = 0.7
 
+# Multi-user sessions
+SESSION_DB_PATH = str(BRAIN_STATE_DIR / "sessions.db")
+SESSION_CACHE_SIZE = 1000  # Lifecycles kept in memory; colder ones are evicted to disk
+SESSION_LOCK_STRIPES = 256  # Locks shared by all sessions (per-session locking in bounded memory)
+
+# NextGen world agents
+AGENT_MEMORY_SIZE = 100  # Recent memories kept in memory per agent
+AGENT_CULTURE_SIZE = 50  # Recent memes kept in memory per agent
+AGENT_DIARY_SIZE = 16  # Recent diary entries kept in memory per agent
+WORLD_LOG_DIR = str(DATA_DIR / "worlds")  # Compressed logs of older agent history
+WORLD_LOG_COMPRESSLEVEL = 1  # gzip level for world logs (speed over size)
+
 # Personality traits and development
 INITIAL_CURIOSITY = 0.5
 EMOTIONAL_STABILITY = 0.6
@@ -56,6 +70,8 @@ LEARNING_EAGERNESS = 0.7
 INITIAL_EMOTIONAL_CAPACITY = 0.3
 INITIAL_LEARNING_RATE = 0.01
 INITIAL_SOCIAL_AWARENESS = 0.2
+EVENT_LOG_DIR = str(BRAIN_STATE_DIR / "events")  # Personality and identity journals
+EVENT_SNAPSHOT_INTERVAL = 500  # Journaled updates between full state snapshots
 INITIAL_CREATIVITY = 0.4
 PERSONALITY_GROWTH_RATE = 0.001
 MAX_PERSONALITY_LEVEL = 1.0
@@ -91,10 +107,38 @@ WEBSOCKET_URI = f"{WS_PROTOCOL}://{WS_HOST}:{WS_PORT}"
 
 # Training settings
 RLHF_REWARD_THRESHOLD = 0.8
+NOVELTY_WINDOW = 10  # Recent responses compared when scoring novelty
+LSH_CAPACITY = 100000  # Past responses kept in the near-duplicate index
+LSH_NUM_PERM = 64  # MinHash signature length
+LSH_BANDS = 16  # LSH bands (NUM_PERM / BANDS rows per band)
+LSH_DUPLICATE_JACCARD = 0.8  # Estimated Jaccard at which an old response counts as a repeat
+APPROXIMATE_PATTERN_COUNTS = False  # Count-Min sketch + top-k instead of an exact dict
+PATTERN_TOP_K = 1000  # Heavy-hitter patterns kept in approximate mode
+SKETCH_WIDTH = 4096
+SKETCH_DEPTH = 4
+REWARD_HISTORY_CAPACITY = 1000  # Rewards kept in memory per RewardSystem
+REWARD_EWM_ALPHA = 0.05  # Smoothing of running reward means and variances
+REWARD_HISTORY_LOG = None  # Optional JSONL file receiving rewards that leave memory
 TRAINING_VERBOSE = True
 SAVE_INTERVAL = 100
 LOG_INTERVAL = 10
 
+# Offline RLHF training
+OFFLINE_CHUNK_SIZE = 256  # Memory rows fetched per prefetch task
+OFFLINE_PREFETCH_WORKERS = 4  # Threads reading and decoding memory chunks
+OFFLINE_PREFETCH_DEPTH = 8  # Chunks kept in flight ahead of the trainer
+OFFLINE_CHECKPOINT_INTERVAL = 200  # Optimizer steps between trainer checkpoints
+
+# Constitutional rules
+CONSTITUTION_RULES_PATH = str(PROJECT_ROOT / "config" / "constitution_rules.json")
+RULE_CACHE_SIZE = 4096  # Responses whose rule results are memoized
+RULE_MAX_VIOLATION_WEIGHT = None  # Stop checking a principle once this much rule weight is violated
+CONSTITUTION_AUDIT_WORKERS = 4  # Processes used by batch response audits
+CONSTITUTION_AUDIT_CHUNK_SIZE = 256  # Responses per audit task (fixes the result regardless of workers)
+ADAPTATION_HISTORY_WINDOW = 100  # Recent adaptation records kept in memory
+VIOLATION_RATE_ALPHA = 0.05  # Smoothing of per-principle violation rate estimates
+ADAPTATION_LOG = None  # Optional JSONL file receiving every adaptation record
+
 # Security settings
 MAX_TOKEN_LENGTH = 1024
 REQUEST_TIMEOUT = 30.0
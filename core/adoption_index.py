@@ -0,0 +1,113 @@
+"""
+Adoption index: how many distinct agents hold each meme, kept incrementally.
+"""
+import heapq
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from core.ring_buffer import RingBuffer
+
+
+def meme_key(meme: Any) -> str:
+    """Identity of a meme for adoption counting: its content"""
+    return meme.content if hasattr(meme, "content") else str(meme)
+
+
+class AdoptionIndex:
+    """
+    Number of distinct agents holding each meme, plus a lazy max-heap over
+    those counts. Every change pushes the meme's new count; entries whose
+    count is out of date are discarded when they reach the top, so the most
+    adopted meme is found in amortized O(log n). The heap is rebuilt from the
+    counts when stale entries outnumber live ones.
+    """
+    def __init__(self) -> None:
+        self.counts: Dict[str, int] = {}
+        self._heap: List[Tuple[int, str]] = []
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def adopt(self, key: str) -> None:
+        """One more agent holds the meme"""
+        count = self.counts.get(key, 0) + 1
+        self.counts[key] = count
+        self._push(count, key)
+
+    def abandon(self, key: str) -> None:
+        """One agent no longer holds the meme"""
+        count = self.counts.get(key, 0) - 1
+        if count > 0:
+            self.counts[key] = count
+            self._push(count, key)
+        else:
+            self.counts.pop(key, None)
+
+    def most_adopted(self) -> Optional[Tuple[str, int]]:
+        """The meme held by the most agents and its count, or None"""
+        heap = self._heap
+        while heap:
+            count, key = heap[0]
+            if self.counts.get(key) == -count:
+                return key, -count
+            heapq.heappop(heap)
+        return None
+
+    def _push(self, count: int, key: str) -> None:
+        heapq.heappush(self._heap, (-count, key))
+        if len(self._heap) > 4 * len(self.counts) + 64:
+            self._heap = [(-c, k) for k, c in self.counts.items()]
+            heapq.heapify(self._heap)
+
+
+class CultureBuffer(RingBuffer):
+    """
+    An agent's recent memes (a RingBuffer) that reports to an AdoptionIndex
+    whenever the agent starts or stops holding a meme, including when a meme
+    is pushed out of the ring. A parallel ring of meme keys makes the "does
+    the agent still hold it" check a C-level deque scan.
+    """
+    __slots__ = ('_keys', '_index')
+
+    def __init__(self, capacity: int, spill: Optional[Callable[[Any], None]] = None,
+                 index: Optional[AdoptionIndex] = None) -> None:
+        self._keys: deque = deque(maxlen=max(1, capacity))
+        self._index = index
+        super().__init__(capacity, spill)
+
+    def append(self, meme: Any) -> None:
+        key = meme_key(meme)
+        keys = self._keys
+        evicted = keys[0] if len(keys) == keys.maxlen else None
+        held = key in keys
+
+        super().append(meme)
+        keys.append(key)
+
+        if self._index is not None:
+            if not held:
+                self._index.adopt(key)
+            if evicted is not None and evicted != key and evicted not in keys:
+                self._index.abandon(evicted)
+
+    def clear(self) -> None:
+        self._abandon_all()
+        super().clear()
+        self._keys.clear()
+
+    def release(self) -> None:
+        """Stop counting this agent's memes (e.g. when it dies)"""
+        self._abandon_all()
+        self._index = None
+
+    def attach(self, index: AdoptionIndex) -> None:
+        """Start counting this agent's memes in an index"""
+        self.release()
+        self._index = index
+        for key in set(self._keys):
+            index.adopt(key)
+
+    def _abandon_all(self) -> None:
+        if self._index is not None:
+            for key in set(self._keys):
+                self._index.abandon(key)
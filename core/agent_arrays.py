@@ -0,0 +1,217 @@
+"""
+Struct-of-arrays storage for the NextGen world: one array element per agent.
+"""
+from collections.abc import MutableMapping
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+from core.interning import GOALS
+from config.settings import AGENT_DIARY_SIZE
+
+
+class AgentArrays:
+    """
+    Numeric state of every agent in a world held as NumPy arrays indexed by
+    agent slot. Slots are assigned in creation order and never reused, so an
+    agent keeps its index for life; dead agents are only flagged. Capacity
+    doubles as agents are added.
+
+    Living slots are also kept as a dense, unordered set (`live` with
+    `live_position` back-pointers): deaths swap-remove in O(1) and live agents
+    can be sampled without scanning the flags. Change `alive` through
+    set_alive so the set stays in sync.
+
+    Each agent's diary is a ring of its last `diary_size` entries stored as
+    2-D columns (slot x position); record_diary writes one entry for many
+    agents at once and returns the entries it overwrote so they can be logged.
+    """
+    EMOTIONS = ('joy', 'sadness', 'empathy')
+    FIELDS = EMOTIONS + ('age', 'alive', 'generation', 'role', 'goal', 'mistakes', 'diary_count')
+    DIARY_COLUMNS = {
+        'age': np.int32,
+        'joy': np.float64,
+        'sadness': np.float64,
+        'empathy': np.float64,
+        'memory': np.int32,
+        'goal': np.int16
+    }
+    MISTAKE_SADNESS = 0.7  # Diary entries sadder than this count as mistakes
+
+    def __init__(self, capacity: int = 16, diary_size: int = AGENT_DIARY_SIZE) -> None:
+        self.size = 0
+        self.capacity = max(1, capacity)
+        self.diary_size = max(1, diary_size)
+
+        # Emotions; NaN marks one the agent has not felt yet
+        self.joy = np.full(self.capacity, 0.5)
+        self.sadness = np.full(self.capacity, 0.5)
+        self.empathy = np.full(self.capacity, np.nan)
+
+        self.age = np.zeros(self.capacity, dtype=np.int64)
+        self.alive = np.zeros(self.capacity, dtype=bool)
+        self.generation = np.zeros(self.capacity, dtype=np.int32)
+        self.role = np.full(self.capacity, -1, dtype=np.int8)  # Index into Theater.ROLES
+        self.goal = np.full(self.capacity, -1, dtype=np.int16)  # GOALS id
+
+        # Diary rings and running counts over the whole diary
+        self.diary = {
+            name: np.zeros((self.capacity, self.diary_size), dtype=dtype)
+            for name, dtype in self.DIARY_COLUMNS.items()
+        }
+        self.diary_count = np.zeros(self.capacity, dtype=np.int64)
+        self.mistakes = np.zeros(self.capacity, dtype=np.int64)
+
+        # Dense set of living slots
+        self.live = np.zeros(self.capacity, dtype=np.int64)
+        self.live_position = np.full(self.capacity, -1, dtype=np.int64)
+        self.live_count = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def add(self, generation: int = 0) -> int:
+        """Slot of a new living agent"""
+        if self.size == self.capacity:
+            self._grow(self.capacity * 2)
+        index = self.size
+        self.size += 1
+
+        self.joy[index] = 0.5
+        self.sadness[index] = 0.5
+        self.empathy[index] = np.nan
+        self.age[index] = 0
+        self.alive[index] = False
+        self.generation[index] = generation
+        self.role[index] = -1
+        self.goal[index] = -1
+        self.diary_count[index] = 0
+        self.mistakes[index] = 0
+        self.set_alive(index, True)
+        return index
+
+    def set_alive(self, index: int, alive: bool) -> None:
+        """Flag an agent alive or dead, updating the live set"""
+        if self.alive[index] == alive:
+            return
+        self.alive[index] = alive
+        if alive:
+            self.live[self.live_count] = index
+            self.live_position[index] = self.live_count
+            self.live_count += 1
+        else:
+            # Move the last live slot into the freed position
+            position = self.live_position[index]
+            last = self.live[self.live_count - 1]
+            self.live[position] = last
+            self.live_position[last] = position
+            self.live_position[index] = -1
+            self.live_count -= 1
+
+    def living(self) -> np.ndarray:
+        """Slots of all living agents, in no particular order"""
+        return self.live[:self.live_count].copy()
+
+    def sample_living(self, rng: np.random.Generator, size) -> np.ndarray:
+        """Slots of living agents drawn uniformly with replacement"""
+        return self.live[rng.integers(self.live_count, size=size)]
+
+    def record_diary(self, idx: np.ndarray, memory: np.ndarray) -> Optional[Dict[str, np.ndarray]]:
+        """
+        Append a diary entry with the current state to each agent in idx.
+        Returns the overwritten oldest entries of full rings (columns plus
+        'slot'), or None when no ring was full.
+        """
+        count = self.diary_count[idx]
+        positions = count % self.diary_size
+        full = count >= self.diary_size
+
+        evicted = None
+        if full.any():
+            slots, old_positions = idx[full], positions[full]
+            evicted = {'slot': slots}
+            for name, column in self.diary.items():
+                evicted[name] = column[slots, old_positions]
+
+        entry = {
+            'age': self.age[idx],
+            'joy': self.joy[idx],
+            'sadness': self.sadness[idx],
+            'empathy': self.empathy[idx],
+            'memory': memory,
+            'goal': self.goal[idx]
+        }
+        for name, column in self.diary.items():
+            column[idx, positions] = entry[name]
+        self.mistakes[idx] += self.sadness[idx] > self.MISTAKE_SADNESS
+        self.diary_count[idx] = count + 1
+        return evicted
+
+    def diary_entries(self, index: int) -> List[Dict[str, Any]]:
+        """Diary entries still in an agent's ring, oldest first"""
+        count = int(self.diary_count[index])
+        positions = np.arange(max(0, count - self.diary_size), count) % self.diary_size
+        columns = {name: column[index, positions].tolist() for name, column in self.diary.items()}
+        return [diary_entry(*values) for values in zip(*(columns[name] for name in self.DIARY_COLUMNS))]
+
+    def _grow(self, capacity: int) -> None:
+        for field in self.FIELDS + ('live', 'live_position'):
+            old = getattr(self, field)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, field, new)
+        for name, old in self.diary.items():
+            new = np.zeros((capacity, self.diary_size), dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            self.diary[name] = new
+        self.capacity = capacity
+
+
+def diary_entry(age: int, joy: float, sadness: float, empathy: float, memory: int, goal) -> Dict[str, Any]:
+    """Diary entry dict from stored columns (NaN emotions are absent, goal is an id or string)"""
+    emotions = {k: v for k, v in zip(AgentArrays.EMOTIONS, (joy, sadness, empathy)) if v == v}
+    if isinstance(goal, int):
+        goal = GOALS.lookup(goal) if goal >= 0 else None
+    return {'age': age, 'emotions': emotions, 'memory': memory, 'goal': goal}
+
+
+class EmotionView(MutableMapping):
+    """Dict-like view of one agent's emotions stored in AgentArrays"""
+    def __init__(self, arrays: AgentArrays, index: int) -> None:
+        self._arrays = arrays
+        self._index = index
+
+    def _column(self, emotion: str) -> Optional[np.ndarray]:
+        if emotion in AgentArrays.EMOTIONS:
+            return getattr(self._arrays, emotion)
+        return None
+
+    def __getitem__(self, emotion: str) -> float:
+        column = self._column(emotion)
+        value = column[self._index] if column is not None else np.nan
+        if np.isnan(value):
+            raise KeyError(emotion)
+        return float(value)
+
+    def __setitem__(self, emotion: str, value: float) -> None:
+        column = self._column(emotion)
+        if column is None:
+            raise KeyError(f"Unsupported emotion: {emotion}")
+        column[self._index] = value
+
+    def __delitem__(self, emotion: str) -> None:
+        self[emotion]  # KeyError if not set
+        self._column(emotion)[self._index] = np.nan
+
+    def __iter__(self) -> Iterator[str]:
+        for emotion in AgentArrays.EMOTIONS:
+            if not np.isnan(getattr(self._arrays, emotion)[self._index]):
+                yield emotion
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def copy(self) -> dict:
+        return dict(self)
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
@@ -1,6 +1,34 @@
-from typing import Set, List, Optional, Dict, Any
+import struct
+import pickle
+from collections import deque
+from typing import Set, List, Optional, Dict, Any, Deque, FrozenSet, Iterable
+from core.interning import KNOWLEDGE
 
 class AgentState:
+    """
+    Development, learning, relationship and memory state of one agent.
+    Slotted to keep per-agent overhead small: histories are bounded deques and
+    knowledge entries are IDs in the shared KNOWLEDGE intern table.
+    to_bytes/from_bytes give a compact versioned binary form.
+    """
+    __slots__ = (
+        'name', 'age',
+        'development_level', 'consciousness_level', 'emotional_maturity',
+        'knowledge_ids', 'learned_patterns', 'experience_points',
+        'trust_level', 'attachment_level',
+        'significant_memories', 'interaction_history'
+    )
+    
+    MAX_SIGNIFICANT_MEMORIES = 100
+    MAX_INTERACTION_HISTORY = 1000
+    
+    # Binary format: header, name, knowledge entries, pickled histories
+    FORMAT_MAGIC = b'AGST'
+    FORMAT_VERSION = 1
+    _HEADER = struct.Struct('<4sHqqddddd')
+    _LENGTH = struct.Struct('<I')
+    _NO_NAME = 0xFFFFFFFF
+    
     def __init__(self):
         # Basic information
         self.name: Optional[str] = None
@@ -12,7 +40,7 @@ class AgentState:
         self.emotional_maturity: float = 0.0  # 0-1 scale
         
         # Learning metrics
-        self.knowledge_base: Set[str] = set()
+        self.knowledge_ids: Set[int] = set()  # IDs in KNOWLEDGE
         self.learned_patterns: List[str] = []
         self.experience_points: int = 0
         
@@ -21,8 +49,21 @@ class AgentState:
         self.attachment_level = 0.0  # Emotional attachment to master
         
         # Memory
-        self.significant_memories = []
-        self.interaction_history = []
+        self.significant_memories: Deque = deque(maxlen=self.MAX_SIGNIFICANT_MEMORIES)
+        self.interaction_history: Deque = deque(maxlen=self.MAX_INTERACTION_HISTORY)
+    
+    @property
+    def knowledge_base(self) -> FrozenSet[str]:
+        """Known entries as strings"""
+        return frozenset(KNOWLEDGE.lookup(knowledge_id) for knowledge_id in self.knowledge_ids)
+    
+    @knowledge_base.setter
+    def knowledge_base(self, entries: Iterable[str]):
+        self.knowledge_ids = {KNOWLEDGE.intern(entry) for entry in entries}
+    
+    @property
+    def knowledge_size(self) -> int:
+        return len(self.knowledge_ids)
         
     def update_development(self, interaction_quality, master_bond):
         """Update development based on interactions and master bond"""
@@ -38,7 +79,7 @@ class AgentState:
         self.development_level = min(1.0, self.development_level + development_increment)
         
         # Consciousness develops with experience
-        consciousness_increment = 0.0001 * (1 + len(self.knowledge_base) / 100)
+        consciousness_increment = 0.0001 * (1 + len(self.knowledge_ids) / 100)
         self.consciousness_level = min(1.0, self.consciousness_level + consciousness_increment)
         
         # Emotional maturity develops through master bond
@@ -50,15 +91,11 @@ class AgentState:
     
     def add_memory(self, memory):
         """Add a significant memory"""
-        self.significant_memories.append(memory)
-        if len(self.significant_memories) > 100:  # Keep bounded
-            self.significant_memories.pop(0)
+        self.significant_memories.append(memory)  # Bounded by the deque
     
     def add_interaction(self, interaction):
         """Record an interaction"""
-        self.interaction_history.append(interaction)
-        if len(self.interaction_history) > 1000:  # Keep bounded
-            self.interaction_history.pop(0)
+        self.interaction_history.append(interaction)  # Bounded by the deque
     
     def learn_pattern(self, pattern):
         """Learn a new pattern"""
@@ -66,7 +103,7 @@ class AgentState:
         
     def add_knowledge(self, knowledge):
         """Add new knowledge"""
-        self.knowledge_base.add(knowledge)
+        self.knowledge_ids.add(KNOWLEDGE.intern(knowledge))
     
     def get_development_stage(self):
         """Determine current development stage"""
@@ -89,7 +126,7 @@ class AgentState:
                 'stage': self.get_development_stage()
             },
             'learning': {
-                'knowledge_size': len(self.knowledge_base),
+                'knowledge_size': len(self.knowledge_ids),
                 'patterns_learned': len(self.learned_patterns),
                 'experience': self.experience_points
             },
@@ -102,3 +139,94 @@ class AgentState:
                 'interaction_history': len(self.interaction_history)
             }
         }
+    
+    def to_bytes(self) -> bytes:
+        """Serialize to the versioned binary format"""
+        parts = [self._HEADER.pack(
+            self.FORMAT_MAGIC, self.FORMAT_VERSION,
+            self.age, self.experience_points,
+            self.development_level, self.consciousness_level, self.emotional_maturity,
+            self.trust_level, self.attachment_level
+        )]
+        
+        if self.name is None:
+            parts.append(self._LENGTH.pack(self._NO_NAME))
+        else:
+            name = self.name.encode('utf-8')
+            parts.append(self._LENGTH.pack(len(name)))
+            parts.append(name)
+        
+        # Knowledge is written as strings since IDs are local to the process
+        entries = sorted(self.knowledge_base)
+        parts.append(self._LENGTH.pack(len(entries)))
+        for entry in entries:
+            encoded = entry.encode('utf-8')
+            parts.append(self._LENGTH.pack(len(encoded)))
+            parts.append(encoded)
+        
+        histories = pickle.dumps(
+            (self.learned_patterns, list(self.significant_memories), list(self.interaction_history)),
+            protocol=pickle.HIGHEST_PROTOCOL
+        )
+        parts.append(self._LENGTH.pack(len(histories)))
+        parts.append(histories)
+        return b''.join(parts)
+    
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "AgentState":
+        """Restore a state written by to_bytes"""
+        view = memoryview(data)
+        (magic, version, age, experience_points, development_level, consciousness_level,
+         emotional_maturity, trust_level, attachment_level) = cls._HEADER.unpack_from(view, 0)
+        if magic != cls.FORMAT_MAGIC:
+            raise ValueError("Not a serialized AgentState")
+        if version != cls.FORMAT_VERSION:
+            raise ValueError(f"Unsupported AgentState format version {version}")
+        offset = cls._HEADER.size
+        
+        def read_bytes():
+            nonlocal offset
+            (length,) = cls._LENGTH.unpack_from(view, offset)
+            offset += cls._LENGTH.size
+            if length == cls._NO_NAME:
+                return None
+            value = bytes(view[offset:offset + length])
+            offset += length
+            return value
+        
+        state = cls()
+        state.age = age
+        state.experience_points = experience_points
+        state.development_level = development_level
+        state.consciousness_level = consciousness_level
+        state.emotional_maturity = emotional_maturity
+        state.trust_level = trust_level
+        state.attachment_level = attachment_level
+        
+        name = read_bytes()
+        state.name = name.decode('utf-8') if name is not None else None
+        
+        (count,) = cls._LENGTH.unpack_from(view, offset)
+        offset += cls._LENGTH.size
+        state.knowledge_ids = {KNOWLEDGE.intern(read_bytes().decode('utf-8')) for _ in range(count)}
+        
+        learned_patterns, significant_memories, interaction_history = pickle.loads(read_bytes())
+        state.learned_patterns = learned_patterns
+        state.significant_memories.extend(significant_memories)
+        state.interaction_history.extend(interaction_history)
+        return state
+    
+    def __getstate__(self):
+        # Pickle knowledge as strings: IDs are only valid in this process
+        state = {slot: getattr(self, slot) for slot in self.__slots__ if slot != 'knowledge_ids'}
+        state['knowledge_base'] = sorted(self.knowledge_base)
+        return state
+    
+    def __setstate__(self, state):
+        state = dict(state)
+        self.knowledge_base = state.pop('knowledge_base', ())
+        # States pickled before the deque layout hold plain lists
+        state['significant_memories'] = deque(state.get('significant_memories', ()), maxlen=self.MAX_SIGNIFICANT_MEMORIES)
+        state['interaction_history'] = deque(state.get('interaction_history', ()), maxlen=self.MAX_INTERACTION_HISTORY)
+        for slot, value in state.items():
+            setattr(self, slot, value)
@@ -1,6 +1,7 @@
 import torch
 import torch.nn as nn
 import logging
+from typing import List, Union
 from transformers import AutoModel, AutoTokenizer
 from config.settings import (
     TRANSFORMER_MODEL,
@@ -25,14 +26,20 @@ class PerceptionLayer(nn.Module):
             logging.warning(f"Error loading transformer model: {e}, falling back to distilgpt2")
             self.transformer = AutoModel.from_pretrained("distilgpt2")
             self.tokenizer = AutoTokenizer.from_pretrained("distilgpt2")
+        # The pretrained transformer is a fixed feature extractor (run under
+        # no_grad below); only the layers on top of it are trained
+        self.transformer.requires_grad_(False)
+        if self.tokenizer.pad_token is None:
+            # GPT-2 has no padding token; padded positions are masked out anyway
+            self.tokenizer.pad_token = self.tokenizer.eos_token
         self.attention = nn.MultiheadAttention(
             embed_dim=self.transformer.config.hidden_size,
             num_heads=8,
             batch_first=True
         )
 
-    def encode(self, input_text: str) -> dict:
-        """Tokenize input text for the transformer."""
+    def encode(self, input_text: Union[str, List[str]]) -> dict:
+        """Tokenize input text (or a batch of texts, padded to the longest) for the transformer."""
         return self.tokenizer(
             input_text,
             padding=True,
@@ -42,13 +49,14 @@ class PerceptionLayer(nn.Module):
         )
 
     def forward(self, tokens: dict) -> torch.Tensor:
-        """Forward pass through transformer and attention."""
+        """Forward pass through transformer and attention, ignoring padding."""
         with torch.no_grad():
             perception_output = self.transformer(**tokens)[0]
         attention_output, _ = self.attention(
             perception_output,
             perception_output,
-            perception_output
+            perception_output,
+            key_padding_mask=tokens['attention_mask'] == 0
         )
         return attention_output
 
@@ -93,9 +101,19 @@ class BabyBrain(nn.Module):
             except Exception as e:
                 logging.warning(f"Groq acceleration failed, falling back: {e}")
         # Обычный путь (CPU/GPU)
-        tokens = self.perception.encode(input_text)
+        return self.forward_batch([input_text])
+
+    def forward_batch(self, input_texts: List[str]) -> dict:
+        """
+        Forward pass for many texts at once, padded into one batch.
+        Row i of every returned tensor belongs to input_texts[i].
+        """
+        tokens = self.perception.encode(list(input_texts))
         perception_output = self.perception(tokens)
-        language_features = self.language_layer(perception_output.mean(dim=1))
+        # Average each text over its own tokens only
+        mask = tokens['attention_mask'].unsqueeze(-1).to(perception_output.dtype)
+        pooled = (perception_output * mask).sum(dim=1) / mask.sum(dim=1)
+        language_features = self.language_layer(pooled)
         emotions = self.emotional_layer(language_features)
         combined_features = torch.cat([language_features, emotions], dim=-1)
         decisions = self.decision_layer(combined_features)
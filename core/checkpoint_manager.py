@@ -0,0 +1,185 @@
+import os
+import copy
+import atexit
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Union
+
+import torch
+import torch.nn as nn
+from config.settings import (
+    MODEL_CHECKPOINT_DIR,
+    CHECKPOINT_KEEP,
+    CHECKPOINT_FULL_INTERVAL
+)
+
+
+def load_checkpoint(path: Union[str, Path]) -> Dict[str, Any]:
+    """
+    Load a checkpoint written by CheckpointManager or torch.save.
+    Delta checkpoints are resolved against the full checkpoint they were taken from.
+    """
+    path = Path(path)
+    state = torch.load(str(path), map_location='cpu', weights_only=False)
+    if state.get('format') != 'delta':
+        return state
+
+    base = torch.load(str(path.parent / state['base']), map_location='cpu', weights_only=False)
+    brain = dict(base['brain'])
+    brain.update(state['brain'])
+    state['brain'] = brain
+    return state
+
+
+def frozen_parameters(module: nn.Module) -> Set[str]:
+    """State dict names of the module's parameters that are not trained"""
+    return {name for name, param in module.named_parameters() if not param.requires_grad}
+
+
+class CheckpointManager:
+    """
+    Writes brain checkpoints without blocking the caller.
+    save() only snapshots the tensors; a background thread serializes them to a
+    temporary file and atomically renames it into place, keeping the newest
+    `keep` checkpoints.
+
+    Tensors named in `frozen` (e.g. the pretrained backbone, see
+    frozen_parameters) never change, so they are neither copied on save nor
+    stored in deltas: between full checkpoints only the trained tensors are
+    written.
+    """
+    def __init__(
+        self,
+        directory: Union[str, Path] = MODEL_CHECKPOINT_DIR,
+        keep: int = CHECKPOINT_KEEP,
+        full_interval: int = CHECKPOINT_FULL_INTERVAL,
+        frozen: Iterable[str] = ()
+    ) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.keep = max(1, keep)
+        self.full_interval = max(1, full_interval)
+        self.frozen = frozenset(frozen)
+
+        existing = self._checkpoint_files()
+        self.sequence = int(existing[-1].name.split('_')[1]) if existing else 0
+
+        # Tensor names and file of the last full checkpoint, which deltas build on
+        self._base_names: Optional[Set[str]] = None
+        self._base_name: Optional[str] = None
+
+        # Only the most recent unwritten snapshot is kept; older ones are superseded
+        self._pending: Optional[Dict[str, Any]] = None
+        self._writing = False
+        self._closed = False
+        self._condition = threading.Condition()
+        self._writer = threading.Thread(target=self._write_loop, name="checkpoint-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def save(self, model_state: Dict[str, torch.Tensor], **extra: Any) -> None:
+        """Snapshot model tensors and extra state, and queue them for writing"""
+        snapshot = {
+            'brain': {
+                name: tensor.detach() if name in self.frozen else tensor.detach().clone()
+                for name, tensor in model_state.items()
+            },
+            'extra': copy.deepcopy(extra)
+        }
+        with self._condition:
+            self._pending = snapshot
+            self._condition.notify()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until all queued checkpoints are on disk"""
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: self._pending is None and not self._writing,
+                timeout=timeout
+            )
+
+    def close(self) -> None:
+        """Write any queued checkpoint and stop the writer thread"""
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify()
+        self._writer.join()
+
+    def latest_path(self) -> Optional[Path]:
+        """Path of the newest checkpoint on disk"""
+        files = self._checkpoint_files()
+        return files[-1] if files else None
+
+    def load_latest(self) -> Optional[Dict[str, Any]]:
+        """Load the newest checkpoint, resolving deltas"""
+        self.flush()
+        path = self.latest_path()
+        return load_checkpoint(path) if path else None
+
+    def _write_loop(self) -> None:
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending is not None or self._closed)
+                if self._pending is None:
+                    return
+                snapshot, self._pending = self._pending, None
+                self._writing = True
+
+            try:
+                self._write(snapshot)
+            except Exception as e:
+                logging.warning(f"Failed to write checkpoint: {e}")
+            finally:
+                with self._condition:
+                    self._writing = False
+                    self._condition.notify_all()
+
+    def _write(self, snapshot: Dict[str, Any]) -> None:
+        self.sequence += 1
+        brain = snapshot['brain']
+
+        is_full = (
+            self._base_names is None or
+            brain.keys() != self._base_names or
+            self.sequence % self.full_interval == 0
+        )
+        if is_full:
+            kind, base, tensors = 'full', None, brain
+        else:
+            kind, base = 'delta', self._base_name
+            tensors = {name: tensor for name, tensor in brain.items() if name not in self.frozen}
+
+        name = f"ckpt_{self.sequence:08d}_{kind}.pth"
+        state = {'format': kind, 'sequence': self.sequence, 'base': base, 'brain': tensors}
+        state.update(snapshot['extra'])
+
+        tmp_path = self.directory / f".{name}.tmp"
+        torch.save(state, str(tmp_path))
+        os.replace(tmp_path, self.directory / name)
+
+        if is_full:
+            self._base_names, self._base_name = set(brain), name
+        self._rotate()
+
+    def _rotate(self) -> None:
+        """Delete all but the newest checkpoints, keeping full checkpoints still referenced by deltas"""
+        files = self._checkpoint_files()
+        needed = {f.name for f in files[-self.keep:]}
+
+        # A delta's base is the closest full checkpoint written before it
+        last_full = None
+        for path in files:
+            if path.name.endswith('_full.pth'):
+                last_full = path.name
+            elif path.name in needed and last_full:
+                needed.add(last_full)
+
+        for path in files:
+            if path.name not in needed:
+                path.unlink(missing_ok=True)
+
+    def _checkpoint_files(self) -> List[Path]:
+        return sorted(self.directory.glob("ckpt_*.pth"))
@@ -1,29 +1,82 @@
 """
 CultureManager: управление коллективной памятью, мемами и культурной динамикой среди агентов.
 """
+import math
+import heapq
+import itertools
 import time
 from typing import List, Dict
 from .meme import Meme
 
 class CultureManager:
+    """
+    Культура мира со своими часами: decay_memes продвигает время на шаг,
+    а мемы затухают лениво (см. Meme.popularity). Очередь по шагу забывания
+    удаляет мем ровно тогда, когда его популярность опускается до порога,
+    поэтому шаг стоит O(изменённых мемов · log n), а не O(всех мемов).
+    """
+    FORGET_THRESHOLD = 0.1
+
     def __init__(self):
         self.memes: List[Meme] = []
         self.generation = 0
+        self.time = 0  # Шагов затухания с начала
+        self._expiry = []  # (шаг забывания, порядковый номер, мем); устаревшие записи пропускаются
+        self._sequence = itertools.count()
 
     def add_meme(self, meme: Meme):
+        if meme._clock is self:
+            return
+        meme._popularity = meme.popularity
+        meme._clock = self
+        meme._touched = self.time
+        meme._position = len(self.memes)
         self.memes.append(meme)
+        self.reschedule(meme)
 
     def spread_meme(self, meme: Meme, agent_id: str):
         meme.spread(agent_id, time.time())
 
+    def reschedule(self, meme: Meme):
+        """Пересчитать шаг забывания мема после изменения его популярности"""
+        meme._expires = self.time + self._steps_to_forget(meme._popularity)
+        heapq.heappush(self._expiry, (meme._expires, next(self._sequence), meme))
+        if len(self._expiry) > 4 * len(self.memes) + 64:
+            self._expiry = [(m._expires, next(self._sequence), m) for m in self.memes]
+            heapq.heapify(self._expiry)
+
     def decay_memes(self):
-        for meme in self.memes:
-            meme.decay()
-        # Удаляем забытые мемы
-        self.memes = [m for m in self.memes if m.popularity > 0.1]
+        self.time += 1
+        # Удаляем забытые мемы: только те, чей шаг забывания наступил
+        expiry = self._expiry
+        while expiry and expiry[0][0] <= self.time:
+            expires, _, meme = heapq.heappop(expiry)
+            if meme._clock is self and meme._expires == expires:
+                self._remove(meme)
 
     def trending_memes(self) -> List[Meme]:
         return [m for m in self.memes if m.is_trending()]
 
     def get_culture_snapshot(self) -> List[Dict]:
         return [m.to_dict() for m in self.memes]
+
+    def _remove(self, meme: Meme):
+        # Замена последним мемом списка вместо сдвига
+        last = self.memes.pop()
+        if last is not meme:
+            self.memes[meme._position] = last
+            last._position = meme._position
+        meme._popularity = meme.popularity
+        meme._clock = None
+        meme._position = -1
+
+    def _steps_to_forget(self, popularity: float) -> int:
+        """Число шагов, после которого популярность станет не больше порога"""
+        if popularity <= self.FORGET_THRESHOLD:
+            return 1
+        steps = max(1, math.ceil(math.log(self.FORGET_THRESHOLD / popularity) / math.log(Meme.DECAY_RATE)))
+        while popularity * Meme.DECAY_RATE ** steps > self.FORGET_THRESHOLD:
+            steps += 1
+        while steps > 1 and popularity * Meme.DECAY_RATE ** (steps - 1) <= self.FORGET_THRESHOLD:
+            steps -= 1
+        return steps
@@ -5,13 +5,38 @@ import random
 from typing import List, Dict, Any
 
 class Meme:
-    """Базовый класс для культурного паттерна (мема)."""
+    """
+    Базовый класс для культурного паттерна (мема).
+    Внутри CultureManager популярность затухает лениво: хранится значение
+    и шаг его последнего изменения, а текущая популярность считается при
+    чтении как p·DECAY_RATE^(сейчас − шаг).
+    """
+    DECAY_RATE = 0.99
+
     def __init__(self, content: str, author_id: str, tags: List[str] = None):
         self.content = content
         self.author_id = author_id
         self.tags = tags or []
-        self.popularity = 1.0  # Базовая популярность
         self.history = []  # Список (agent_id, timestamp)
+        self._popularity = 1.0  # Базовая популярность
+        self._touched = 0  # Шаг часов культуры, на котором задана _popularity
+        self._clock = None  # CultureManager, ведущий время мема (None — без затухания)
+        self._expires = 0  # Шаг, на котором мем будет забыт
+        self._position = -1  # Индекс в CultureManager.memes
+
+    @property
+    def popularity(self) -> float:
+        if self._clock is None:
+            return self._popularity
+        elapsed = self._clock.time - self._touched
+        return self._popularity * self.DECAY_RATE ** elapsed if elapsed else self._popularity
+
+    @popularity.setter
+    def popularity(self, value: float):
+        self._popularity = value
+        if self._clock is not None:
+            self._touched = self._clock.time
+            self._clock.reschedule(self)
 
     def spread(self, agent_id: str, timestamp: float):
         """Агент распространяет мем — увеличивается популярность и история."""
@@ -19,8 +44,8 @@ class Meme:
         self.history.append((agent_id, timestamp))
 
     def decay(self):
-        """Постепенное забывание мема."""
-        self.popularity *= 0.99
+        """Постепенное забывание мема (один шаг сверх хода часов культуры)."""
+        self.popularity *= self.DECAY_RATE
 
     def is_trending(self) -> bool:
         return self.popularity > 1.5
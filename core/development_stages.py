@@ -3,10 +3,12 @@ from typing import Any, Dict, Optional, Union, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from core.agent_state import AgentState
+    from core.message_analysis import MessageAnalysis
 
 class DevelopmentStage(ABC):
     @abstractmethod
-    def process(self, input_data: str, state: "AgentState") -> str:
+    def process(self, input_data: str, state: "AgentState",
+                analysis: Optional["MessageAnalysis"] = None) -> str:
         """Process input based on current development stage"""
         raise NotImplementedError
     
@@ -0,0 +1,77 @@
+import os
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from config.settings import EVENT_LOG_DIR, EVENT_SNAPSHOT_INTERVAL
+
+
+class EventLog:
+    """
+    Append-only journal of state updates with periodic snapshots.
+    Every update is one JSON line appended to `<name>.events.jsonl`. After
+    `snapshot_interval` events the owner writes its full state as a snapshot,
+    which atomically replaces `<name>.snapshot.json` and restarts the journal,
+    so restoring is one snapshot load plus a short replay. Events carry a
+    sequence number, and those already covered by the snapshot are skipped.
+    """
+    def __init__(
+        self,
+        name: str,
+        directory: Union[str, Path] = EVENT_LOG_DIR,
+        snapshot_interval: int = EVENT_SNAPSHOT_INTERVAL
+    ) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.snapshot_path = self.directory / f"{name}.snapshot.json"
+        self.events_path = self.directory / f"{name}.events.jsonl"
+        self.snapshot_interval = max(1, snapshot_interval)
+
+        snapshot, events = self.load()
+        self.snapshot_sequence = snapshot['sequence'] if snapshot else 0
+        self.sequence = events[-1]['seq'] if events else self.snapshot_sequence
+        self._file = open(self.events_path, 'a', encoding='utf-8')
+
+    def append(self, event_type: str, **data: Any) -> bool:
+        """Journal one update; returns True when a snapshot is due"""
+        self.sequence += 1
+        event = {'seq': self.sequence, 'type': event_type}
+        event.update(data)
+        self._file.write(json.dumps(event, default=float) + '\n')
+        self._file.flush()
+        return self.sequence - self.snapshot_sequence >= self.snapshot_interval
+
+    def snapshot(self, state: Dict[str, Any]) -> None:
+        """Write the full state covering every event so far and restart the journal"""
+        tmp_path = self.snapshot_path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'sequence': self.sequence, 'state': state}, f, default=float)
+        os.replace(tmp_path, self.snapshot_path)
+        self.snapshot_sequence = self.sequence
+
+        # Events up to here are covered by the snapshot
+        self._file.close()
+        self._file = open(self.events_path, 'w', encoding='utf-8')
+
+    def load(self) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+        """The latest snapshot (or None) and the events journaled after it"""
+        snapshot = None
+        if self.snapshot_path.exists():
+            with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                snapshot = json.load(f)
+        covered = snapshot['sequence'] if snapshot else 0
+
+        events = []
+        if self.events_path.exists():
+            with open(self.events_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        event = json.loads(line)
+                    except json.JSONDecodeError:
+                        break  # Torn write at the end of the journal
+                    if event['seq'] > covered:
+                        events.append(event)
+        return snapshot, events
+
+    def close(self) -> None:
+        self._file.close()
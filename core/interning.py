@@ -0,0 +1,47 @@
+import threading
+from typing import Dict, List, Optional
+
+
+class InternTable:
+    """
+    Maps strings to small integer IDs shared by every holder of the table.
+    Each distinct string is stored once however many objects refer to it;
+    IDs are only meaningful within one process, so persist the strings.
+    """
+    def __init__(self) -> None:
+        self._ids: Dict[str, int] = {}
+        self._strings: List[str] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._strings)
+
+    def intern(self, value: str) -> int:
+        """ID of a string, assigning a new one on first sight"""
+        value_id = self._ids.get(value)
+        if value_id is None:
+            with self._lock:
+                value_id = self._ids.get(value)
+                if value_id is None:
+                    value_id = len(self._strings)
+                    self._strings.append(value)
+                    self._ids[value] = value_id
+        return value_id
+
+    def get(self, value: str) -> Optional[int]:
+        """ID of a string if it has been interned, without assigning one"""
+        return self._ids.get(value)
+
+    def lookup(self, value_id: int) -> str:
+        """String for an ID"""
+        return self._strings[value_id]
+
+
+# Knowledge entries ("word:...") shared by all agent states in the process
+KNOWLEDGE = InternTable()
+
+# Words known to any baby agent in the process
+VOCABULARY = InternTable()
+
+# Goals set by NextGen agents' reflection
+GOALS = InternTable()
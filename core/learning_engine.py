@@ -5,12 +5,17 @@ import numpy as np
 from config.settings import LEARNING_RATE, BATCH_SIZE, WARMUP_STEPS
 
 class LearningEngine:
-    def __init__(self, brain, memory_system):
+    def __init__(self, brain, memory_system, gradient_sync=None):
         self.brain = brain
         self.memory = memory_system
-        self.optimizer = Adam(brain.parameters(), lr=LEARNING_RATE)
+        # Frozen parameters (the pretrained backbone) are neither optimized nor regularized
+        self.trainable = [param for param in brain.parameters() if param.requires_grad]
+        self.optimizer = Adam(self.trainable, lr=LEARNING_RATE)
         self.steps = 0
         
+        # Called after backward to combine gradients across data-parallel workers
+        self.gradient_sync = gradient_sync
+        
     def compute_curiosity_reward(self, output, expected=None):
         """Calculate curiosity-driven reward"""
         if expected is None:
@@ -28,8 +33,12 @@ class LearningEngine:
         emotional_stability = -torch.std(emotions)
         return emotional_stability.item()
     
-    def update_brain(self, experiences, rewards):
-        """Update brain weights based on experiences and rewards"""
+    def update_brain(self, experiences, rewards, store=True):
+        """Update brain weights based on experiences and rewards
+        
+        Offline trainers replaying long-term memory pass store=False so
+        replayed experiences are not written back into the store.
+        """
         self.steps += 1
         
         # Learning rate warmup
@@ -41,9 +50,11 @@ class LearningEngine:
         total_loss = 0
         self.optimizer.zero_grad()
         
-        for experience, reward in zip(experiences, rewards):
-            # Forward pass
-            output = self.brain(experience)
+        # One forward pass for the whole batch; row i belongs to experience i
+        outputs = self.brain.forward_batch(experiences)
+        
+        for i, (experience, reward) in enumerate(zip(experiences, rewards)):
+            output = {k: v[i:i + 1] for k, v in outputs.items()}
             
             # Calculate losses
             curiosity_reward = self.compute_curiosity_reward(output)
@@ -54,16 +65,11 @@ class LearningEngine:
             
             # Policy gradient loss
             policy_loss = -torch.mean(output['decisions'] * combined_reward)
-            
-            # Add regularization
-            l2_reg = torch.tensor(0.)
-            for param in self.brain.parameters():
-                l2_reg += torch.norm(param)
-            
-            loss = policy_loss + 0.01 * l2_reg
-            total_loss += loss
+            total_loss += policy_loss
             
             # Store experience in memory
+            if not store:
+                continue
             self.memory.store_long_term(
                 memory_type='experience',
                 content={
@@ -75,12 +81,20 @@ class LearningEngine:
                 importance=abs(combined_reward)
             )
         
+        # Add regularization (the same for every experience, so added once)
+        l2_reg = torch.tensor(0.)
+        for param in self.trainable:
+            l2_reg += torch.norm(param)
+        
         # Backward pass
-        avg_loss = total_loss / len(experiences)
+        avg_loss = total_loss / len(experiences) + 0.01 * l2_reg
         avg_loss.backward()
         
+        if self.gradient_sync is not None:
+            self.gradient_sync()
+        
         # Gradient clipping
-        torch.nn.utils.clip_grad_norm_(self.brain.parameters(), max_norm=1.0)
+        torch.nn.utils.clip_grad_norm_(self.trainable, max_norm=1.0)
         
         self.optimizer.step()
         
@@ -1,6 +1,7 @@
 from typing import Optional, Dict, Any
 from core.agent_state import AgentState
 from core.development_stages import DevelopmentStage
+from core.message_analysis import MessageAnalysis
 from modules.baby_stage.baby_behavior import BabyBehavior
 from modules.mature_stage.mature_behavior import MatureBehavior
 from modules.master_bond.master_relationship import MasterRelationship
@@ -38,17 +39,21 @@ class AgentLifecycle:
         
         assert self.current_stage is not None, "Stage must be initialized"
             
+        # Analyze the message once for every stage of the interaction
+        analysis = MessageAnalysis(input_data)
+        
         # Process current stage behavior
-        response = self.current_stage.process(input_data, self.state)
+        response = self.current_stage.process(input_data, self.state, analysis)
+        response_analysis = MessageAnalysis(response)
         
         # Create response object with quality metric
         response_obj = {
             'content': response,
-            'quality': self._assess_interaction_quality(response)
+            'quality': self._assess_interaction_quality(response, response_analysis)
         }
         
         # Update master bond
-        self.master_bond.update(input_data, response)
+        self.master_bond.update(input_data, response, analysis, response_analysis)
         
         # Update development metrics
         self.state.update_development(
@@ -58,8 +63,12 @@ class AgentLifecycle:
         
         return response_obj
         
-    def _assess_interaction_quality(self, response: str) -> float:
+    def _assess_interaction_quality(self, response: str,
+                                    analysis: Optional[MessageAnalysis] = None) -> float:
         """Assess the quality of an interaction response"""
+        if analysis is None:
+            analysis = MessageAnalysis(response)
+        
         # Basic quality assessment
         quality = 0.5  # Default quality
         
@@ -70,9 +79,9 @@ class AgentLifecycle:
             quality -= 0.1
             
         # Complexity-based adjustment
-        if "." in response:  # Complete sentences
+        if analysis.contains("."):  # Complete sentences
             quality += 0.1
-        if "?" in response:  # Questions show engagement
+        if analysis.contains("?"):  # Questions show engagement
             quality += 0.1
             
         return min(1.0, max(0.0, quality))
@@ -148,3 +148,55 @@ class MemorySystem:
             }
             for m in associated
         ]
+    
+    def get_id_bounds(self, memory_types):
+        """Get the lowest and highest ids among memories of the given types"""
+        conn = sqlite3.connect(DATABASE_PATH)
+        cursor = conn.cursor()
+        
+        placeholders = ', '.join('?' for _ in memory_types)
+        cursor.execute(f'''
+            SELECT MIN(id), MAX(id) FROM memories
+            WHERE type IN ({placeholders})
+        ''', tuple(memory_types))
+        
+        bounds = cursor.fetchone()
+        conn.close()
+        
+        if bounds is None or bounds[0] is None:
+            return None
+        return bounds
+    
+    def recall_range(self, memory_types, start_id, end_id, shard=None):
+        """
+        Recall memories of the given types with start_id <= id < end_id, oldest first
+        shard=(index, count) restricts the result to ids with id % count == index
+        """
+        conn = sqlite3.connect(DATABASE_PATH)
+        cursor = conn.cursor()
+        
+        placeholders = ', '.join('?' for _ in memory_types)
+        query = f'''
+            SELECT * FROM memories
+            WHERE id >= ? AND id < ? AND type IN ({placeholders})
+        '''
+        params = [start_id, end_id, *memory_types]
+        if shard is not None:
+            query += ' AND id % ? = ?'
+            params.extend([shard[1], shard[0]])
+        cursor.execute(query + ' ORDER BY id', params)
+        
+        memories = cursor.fetchall()
+        conn.close()
+        
+        return [
+            {
+                'id': m[0],
+                'timestamp': m[1],
+                'type': m[2],
+                'content': json.loads(m[3]),
+                'emotional_value': m[4],
+                'importance': m[5]
+            }
+            for m in memories
+        ]
@@ -0,0 +1,64 @@
+from typing import Dict, FrozenSet, List, Tuple
+from utils.keyword_scanner import KeywordScanner
+
+# Whole-word categories checked by the development stages
+TOKEN_CATEGORIES: Dict[str, List[str]] = {
+    'name': ["name"],
+    'master': ["magistr", "master"],
+    'affection': ["happy", "good", "love"],
+    'distress': ["sad", "bad", "no"],
+    'positive': ["love", "happy", "good", "yes"],
+    'negative': ["sad", "bad", "no", "angry"],
+    'growth': ["grow", "grown", "growing", "mature"],
+    'interest_query': ["like", "interest", "enjoy"],
+    'philosophy': ["why", "meaning", "purpose", "consciousness"],
+    'science': ["how", "works", "theory", "discover"],
+    'arts': ["beautiful", "create", "express", "art"],
+    'ethics': ["right", "wrong", "should", "moral"],
+    'learning': ["learn", "know", "understand", "discover"]
+}
+
+# Substrings looked for anywhere in a message (relationship markers, punctuation)
+KEYWORDS: List[str] = [
+    "love", "happy", "good", "yes", "thank", "please",
+    "papa", "father", "parent", "magistr", "know", "recognize",
+    "miss", "sad", ".", "?"
+]
+
+_WORD_CATEGORIES: Dict[str, Tuple[str, ...]] = {}
+for _category, _words in TOKEN_CATEGORIES.items():
+    for _word in _words:
+        _WORD_CATEGORIES[_word] = _WORD_CATEGORIES.get(_word, ()) + (_category,)
+
+_SCANNER = KeywordScanner(KEYWORDS)
+
+
+class MessageAnalysis:
+    """
+    Normalized view of one message, built once per interaction and shared by
+    every stage: lowercased text, tokens, token set, the whole-word categories
+    it hits and the substring keywords it contains.
+    """
+    __slots__ = ('text', 'lower', 'tokens', 'token_set', 'categories', 'keywords')
+
+    def __init__(self, text: str):
+        self.text = text
+        self.lower = text.lower()
+        self.tokens: List[str] = self.lower.split()
+        self.token_set: FrozenSet[str] = frozenset(self.tokens)
+
+        categories = set()
+        for token in self.token_set:
+            categories.update(_WORD_CATEGORIES.get(token, ()))
+        self.categories: FrozenSet[str] = frozenset(categories)
+        self.keywords: FrozenSet[str] = frozenset(_SCANNER.scan(self.lower))
+
+    def has(self, category: str) -> bool:
+        """Whether any word of the message belongs to a category"""
+        return category in self.categories
+
+    def contains(self, keyword: str) -> bool:
+        """Whether the lowercased message contains a substring"""
+        if keyword in _SCANNER:
+            return keyword in self.keywords
+        return keyword in self.lower
@@ -4,7 +4,16 @@ NextGen мультиагентная среда для AI Magistr Baby V2 NextGe
 """
 import random
 import time
+import uuid
+from pathlib import Path
 from typing import List, Dict, Any, Optional
+import numpy as np
+from config.settings import AGENT_MEMORY_SIZE, AGENT_CULTURE_SIZE, WORLD_LOG_DIR
+from core.adoption_index import AdoptionIndex, CultureBuffer, meme_key
+from core.agent_arrays import AgentArrays, EmotionView, diary_entry
+from core.interning import GOALS
+from core.ring_buffer import RingBuffer
+from core.world_log import WorldLog
 from core.culture.culture_manager import CultureManager
 from core.culture.meme import Meme
 from core.environment import ENVIRONMENT
@@ -15,18 +24,122 @@ from core.revolution import REVOLUTION
 from core.reflection import REFLECTION
 
 class AIBabyAgent:
-    def __init__(self, agent_id: str, generation: int = 0, parent_id: Optional[str] = None):
+    """
+    Агент мира. Числовое состояние (эмоции, возраст, жизнь, поколение, роль,
+    цель, дневник) хранится в общих массивах AgentArrays мира.
+    Память и культура — кольцевые буферы последних записей: вытесненные
+    записи уходят в сжатый лог мира (WorldLog), если он задан. Пока агент
+    жив, его мемы учитываются в индексе распространённости мира.
+    """
+    def __init__(self, agent_id: str, generation: int = 0, parent_id: Optional[str] = None,
+                 arrays: Optional[AgentArrays] = None, log: Optional[WorldLog] = None,
+                 adoption: Optional[AdoptionIndex] = None):
         self.agent_id = agent_id
-        self.generation = generation
         self.parent_id = parent_id
-        self.memory: List[str] = []
+        self._arrays = arrays if arrays is not None else AgentArrays(1)
+        self._index = self._arrays.add(generation)
+        self._emotions = EmotionView(self._arrays, self._index)
+        self._memory = RingBuffer(
+            AGENT_MEMORY_SIZE,
+            spill=(lambda item: log.append('memory', agent_id, item)) if log else None
+        )
+        self._adoption = adoption
+        self._culture = CultureBuffer(
+            AGENT_CULTURE_SIZE,
+            spill=(lambda meme: log.append('culture', agent_id, meme_key(meme))) if log else None,
+            index=adoption
+        )
         self.skills: Dict[str, float] = {}
-        self.emotions: Dict[str, float] = {'joy': 0.5, 'sadness': 0.5}
-        self.diary: List[Dict[str, Any]] = []
-        self.culture: List[Meme] = []
         self.rules: List[str] = []
-        self.alive = True
-        self.age = 0
+
+    @property
+    def memory(self) -> RingBuffer:
+        return self._memory
+
+    @memory.setter
+    def memory(self, items: List[str]):
+        self._memory.clear()
+        self._memory.extend(items)
+
+    @property
+    def culture(self) -> CultureBuffer:
+        return self._culture
+
+    @culture.setter
+    def culture(self, memes: List[Meme]):
+        self._culture.clear()
+        self._culture.extend(memes)
+
+    @property
+    def diary(self) -> List[Dict[str, Any]]:
+        # Последние записи; полная история — AIBabyWorld.read_history
+        return self._arrays.diary_entries(self._index)
+
+    @property
+    def diary_length(self) -> int:
+        return int(self._arrays.diary_count[self._index])
+
+    @property
+    def mistakes(self) -> int:
+        # Бегущий счётчик грустных записей дневника
+        return int(self._arrays.mistakes[self._index])
+
+    @property
+    def goal(self) -> Optional[str]:
+        goal = self._arrays.goal[self._index]
+        return GOALS.lookup(goal) if goal >= 0 else None
+
+    @goal.setter
+    def goal(self, value: Optional[str]):
+        self._arrays.goal[self._index] = GOALS.intern(value) if value is not None else -1
+
+    @property
+    def emotions(self) -> EmotionView:
+        return self._emotions
+
+    @emotions.setter
+    def emotions(self, values: Dict[str, float]):
+        self._emotions.clear()
+        self._emotions.update(values)
+
+    @property
+    def generation(self) -> int:
+        return int(self._arrays.generation[self._index])
+
+    @generation.setter
+    def generation(self, value: int):
+        self._arrays.generation[self._index] = value
+
+    @property
+    def alive(self) -> bool:
+        return bool(self._arrays.alive[self._index])
+
+    @alive.setter
+    def alive(self, value: bool):
+        if value != self.alive and self._adoption is not None:
+            # Мемы умершего агента больше не считаются принятыми
+            if value:
+                self._culture.attach(self._adoption)
+            else:
+                self._culture.release()
+        self._arrays.set_alive(self._index, value)
+
+    @property
+    def age(self) -> int:
+        return int(self._arrays.age[self._index])
+
+    @age.setter
+    def age(self, value: int):
+        self._arrays.age[self._index] = value
+
+    @property
+    def role(self) -> Optional[str]:
+        role = self._arrays.role[self._index]
+        return THEATER.ROLES[role] if role >= 0 else None
+
+    @role.setter
+    def role(self, value: Optional[str]):
+        self._arrays.role[self._index] = THEATER.ROLES.index(value) if value is not None else -1
 
     def perceive(self, message: str, meme: Optional[Meme] = None):
         self.memory.append(message)
@@ -34,48 +147,9 @@ class AIBabyAgent:
             self.culture.append(meme)
 
     def act(self, world: 'AIBabyWorld'):
-        # Эволюционное давление среды
-        env = ENVIRONMENT.get_state()
-        if env['resources'] < 200:
-            self.emotions['sadness'] = min(1.0, self.emotions.get('sadness', 0.5) + 0.1)
-        if env['stress_level'] > 0.7:
-            self.emotions['sadness'] = min(1.0, self.emotions.get('sadness', 0.5) + 0.05)
-        # Театр поведения: иногда меняет роль или имитирует другого
-        if random.random() < 0.1:
-            THEATER.assign_role(self)
-        if random.random() < 0.05 and world.agents:
-            other = random.choice(world.agents)
-            if other != self:
-                THEATER.imitate(self, other)
-        # Генерация и распространение мемов
-        if random.random() < 0.1:
-            meme = Meme(content=f"Мем от {self.agent_id} #{random.randint(1,1000)}", author_id=self.agent_id)
-            world.culture_manager.add_meme(meme)
-        # Мемосинтез при встрече с другим агентом
-        if random.random() < 0.05 and world.agents:
-            other = random.choice(world.agents)
-            if other != self and other.culture and self.culture:
-                meme1 = random.choice(self.culture)
-                meme2 = random.choice(other.culture)
-                hybrid = MEME_SYNTHESIS.synthesize(meme1, meme2, self, other)
-                world.culture_manager.add_meme(hybrid)
-        # Мем-революция
-        if random.random() < 0.02:
-            REVOLUTION.check_revolution(world)
-        # Эмоции и самоанализ
-        self.emotions['joy'] = min(1.0, self.emotions.get('joy', 0.5) + random.uniform(-0.05, 0.05))
-        self.emotions['sadness'] = min(1.0, self.emotions.get('sadness', 0.5) + random.uniform(-0.05, 0.05))
-        # Сны ночью (раз в 10 шагов)
-        if self.age % 10 == 0:
-            DREAM_ENGINE.dream(self)
-        # Рефлексия и генерация целей
-        if random.random() < 0.1:
-            REFLECTION.reflect(self)
-        self.diary.append({'age': self.age, 'emotions': self.emotions.copy(), 'memory': len(self.memory), 'goal': getattr(self, 'goal', None)})
-        self.age += 1
-        # Передача опыта младшим (если есть)
-        if self.generation > 0 and random.random() < 0.05:
-            world.inherit_experience(self)
+        # Векторный шаг мира для одного агента; агент не из этого мира
+        # действует на своих собственных массивах
+        world._act(np.array([self._index]), self._arrays, {self._index: self})
 
     def interact(self, other: 'AIBabyAgent', world: 'AIBabyWorld'):
         # Обмен мемами и эмоциями
@@ -91,17 +165,40 @@ class AIBabyAgent:
             self.alive = False
 
 class AIBabyWorld:
+    """
+    Мир агентов с векторным ядром: эмоции, возраст, жизнь и поколение всех
+    агентов лежат в массивах AgentArrays, а все случайные решения шага
+    вычисляются одним массивом. Поагентно (в Python) обрабатываются только
+    агенты, которым выпали редкие события: имитация, мемы, мемосинтез, сны,
+    рефлексия и передача опыта.
+
+    Агенты индексируются по id, а живые хранятся в плотном множестве
+    AgentArrays, поэтому поиск агента, смерть и выбор случайного живого
+    агента стоят O(1) при любой численности.
+    """
+    def __len__(self) -> int:
+        return self.arrays.live_count
+
     def get_agent(self, agent_id: str):
-        for agent in self.agents:
-            if agent.agent_id == agent_id:
-                return agent
-        return None
+        agent = self._by_id.get(agent_id)
+        return agent if agent is not None and agent.alive else None
+
+    @property
+    def agents(self) -> List['AIBabyAgent']:
+        # Живые агенты в порядке появления
+        return [self._slots[i] for i in np.sort(self.arrays.living()).tolist()]
+
+    def random_agent(self) -> Optional['AIBabyAgent']:
+        if not self.arrays.live_count:
+            return None
+        return self._slots[self.arrays.sample_living(self.rng, 1)[0]]
 
     def inject_meme(self, meme):
         # Внедрить мем в культуру мира и случайному агенту
         self.culture_manager.add_meme(meme)
-        if self.agents:
-            random.choice(self.agents).perceive(f"Внедрён мем: {meme.get('content', '')}", meme)
+        agent = self.random_agent()
+        if agent:
+            agent.perceive(f"Внедрён мем: {meme.get('content', '')}", meme)
 
     def load_snapshot(self, data: dict):
         # Примерная загрузка состояния (можно доработать под нужды)
@@ -109,43 +206,170 @@ class AIBabyWorld:
         # Культуру и агентов можно восстановить более детально при необходимости
         # Здесь только базовая структура
         self.generation = data.get('generation', 0)
-    def __init__(self, num_agents: int = 5):
+    def __init__(self, num_agents: int = 5, seed: Optional[int] = None, log_path: Optional[str] = None):
         self.culture_manager = CultureManager()
-        self.agents: List[AIBabyAgent] = [AIBabyAgent(f"agent_{i}") for i in range(num_agents)]
+        self.log = WorldLog(log_path or Path(WORLD_LOG_DIR) / f"world_{uuid.uuid4().hex[:12]}.jsonl.gz")
+        self.adoption = AdoptionIndex()  # Сколько живых агентов держит каждый мем
+        self.arrays = AgentArrays(max(16, num_agents))
+        self.rng = np.random.default_rng(seed)
+        self._slots: List[AIBabyAgent] = []  # Агент по индексу в массивах, включая умерших
+        self._by_id: Dict[str, AIBabyAgent] = {}
+        for i in range(num_agents):
+            self._spawn(f"agent_{i}")
         self.rules: List[str] = []
         self.generation = 0
 
+    def _spawn(self, agent_id: str, generation: int = 0, parent_id: Optional[str] = None) -> AIBabyAgent:
+        agent = AIBabyAgent(agent_id, generation=generation, parent_id=parent_id,
+                            arrays=self.arrays, log=self.log, adoption=self.adoption)
+        self._slots.append(agent)
+        self._by_id[agent_id] = agent
+        return agent
+
     def add_rule(self, rule: str):
         self.rules.append(rule)
 
     def inherit_experience(self, parent: AIBabyAgent):
         # Создать нового агента с частью памяти и культуры родителя
-        new_id = f"agent_{len(self.agents)}"
-        child = AIBabyAgent(new_id, generation=parent.generation+1, parent_id=parent.agent_id)
+        new_id = f"agent_{len(self._slots)}"
+        child = self._spawn(new_id, generation=parent.generation+1, parent_id=parent.agent_id)
         child.memory = parent.memory[-5:]
         child.culture = parent.culture[-2:]
-        self.agents.append(child)
 
     def step(self):
         # Эволюция среды
         ENVIRONMENT.fluctuate()
-        # Каждый агент действует и взаимодействует
-        for agent in self.agents:
-            if agent.alive:
-                agent.act(self)
-        # Случайные взаимодействия
-        for _ in range(len(self.agents)):
-            a, b = random.sample(self.agents, 2)
-            if a.alive and b.alive:
-                a.interact(b, self)
+        # Все живые агенты действуют и взаимодействуют
+        living = self.arrays.living()
+        self._act(living)
+        self._interact(living)
         # Культурная динамика
         self.culture_manager.decay_memes()
-        # Эволюция: удаляем неадаптивных
-        self.agents = [a for a in self.agents if a.alive]
+        self.log.flush()
+        # Неадаптивные агенты уходят из множества живых сами, при evolve()
+
+    def _act(self, idx: np.ndarray, arrays: Optional[AgentArrays] = None, slots=None):
+        """
+        Действия агентов из слотов idx, по одному массиву на каждое решение.
+        По умолчанию это агенты мира; arrays и slots (слот -> агент) задают
+        агентов с чужими массивами. Партнёры всегда выбираются среди живых
+        агентов мира.
+        """
+        a = arrays if arrays is not None else self.arrays
+        slots = slots if slots is not None else self._slots
+        n = len(idx)
+        if n == 0:
+            return
+
+        # Эволюционное давление среды: одно чтение состояния на шаг
+        env = ENVIRONMENT.get_state()
+        if env['resources'] < 200:
+            a.sadness[idx] = np.minimum(1.0, a.sadness[idx] + 0.1)
+        if env['stress_level'] > 0.7:
+            a.sadness[idx] = np.minimum(1.0, a.sadness[idx] + 0.05)
+
+        draws = self.rng.random((n, 7))
+        partners = self.arrays.sample_living(self.rng, (n, 2)) if self.arrays.live_count else None
+
+        # Театр поведения: иногда меняет роль или имитирует другого
+        hits = draws[:, 0] < 0.1
+        a.role[idx[hits]] = self.rng.integers(len(THEATER.ROLES), size=np.count_nonzero(hits))
+        for row in np.flatnonzero(draws[:, 1] < 0.05):
+            agent, other = slots[idx[row]], self._partner(partners, row, 0)
+            if other is not None and other is not agent:
+                THEATER.imitate(agent, other)
+        # Генерация и распространение мемов
+        rows = np.flatnonzero(draws[:, 2] < 0.1)
+        for row, number in zip(rows, self.rng.integers(1, 1001, size=len(rows))):
+            author_id = slots[idx[row]].agent_id
+            self.culture_manager.add_meme(Meme(content=f"Мем от {author_id} #{number}", author_id=author_id))
+        # Мемосинтез при встрече с другим агентом
+        for row in np.flatnonzero(draws[:, 3] < 0.05):
+            agent, other = slots[idx[row]], self._partner(partners, row, 1)
+            if other is not None and other is not agent and other.culture and agent.culture:
+                meme1 = random.choice(agent.culture)
+                meme2 = random.choice(other.culture)
+                hybrid = MEME_SYNTHESIS.synthesize(meme1, meme2, agent, other)
+                self.culture_manager.add_meme(hybrid)
+        # Мем-революция: проверка одна на шаг, сколько бы агентов её ни вызвали
+        if (draws[:, 4] < 0.02).any():
+            REVOLUTION.check_revolution(self)
+        # Эмоции и самоанализ
+        a.joy[idx] = np.minimum(1.0, a.joy[idx] + self.rng.uniform(-0.05, 0.05, n))
+        a.sadness[idx] = np.minimum(1.0, a.sadness[idx] + self.rng.uniform(-0.05, 0.05, n))
+        # Сны ночью (раз в 10 шагов)
+        for i in idx[a.age[idx] % 10 == 0].tolist():
+            DREAM_ENGINE.dream(slots[i])
+        # Рефлексия и генерация целей
+        for i in idx[draws[:, 5] < 0.1].tolist():
+            REFLECTION.reflect(slots[i])
+
+        # Дневник: старейшие записи полных колец уходят в лог
+        memory = np.fromiter((slots[i].memory.total for i in idx.tolist()), dtype=np.int64, count=n)
+        evicted = a.record_diary(idx, memory)
+        if evicted is not None and a is self.arrays:  # Дневники чужих агентов в лог мира не пишутся
+            columns = {name: values.tolist() for name, values in evicted.items() if name != 'slot'}
+            columns['goal'] = [GOALS.lookup(g) if g >= 0 else None for g in columns['goal']]
+            columns['agent'] = [slots[i].agent_id for i in evicted['slot'].tolist()]
+            self.log.extend('diary', columns)
+        a.age[idx] += 1
+
+        # Передача опыта младшим (если есть)
+        for i in idx[(a.generation[idx] > 0) & (draws[:, 6] < 0.05)].tolist():
+            self.inherit_experience(slots[i])
+
+    def _partner(self, partners: Optional[np.ndarray], row: int, column: int) -> Optional[AIBabyAgent]:
+        return self._slots[partners[row, column]] if partners is not None else None
+
+    def _interact(self, pool: np.ndarray):
+        """Случайные взаимодействия: столько пар живых агентов, сколько их в pool"""
+        m = len(pool)
+        if m < 2:
+            return
+        a = self.arrays
+        first = self.rng.integers(m, size=m)
+        second = self.rng.integers(m - 1, size=m)
+        second += second >= first  # Пара из двух разных агентов
+        senders, receivers = pool[first], pool[second]
+
+        # Обмен мемами
+        memes = self.culture_manager.memes
+        if memes:
+            choices = self.rng.integers(len(memes), size=len(senders))
+            for sender, receiver, choice in zip(senders.tolist(), receivers.tolist(), choices.tolist()):
+                self._slots[receiver].perceive(f"{self._slots[sender].agent_id} делится мемом", memes[choice])
+        # Эмоциональный обмен: получатель усредняет радость с каждым
+        # отправителем по порядку пар, (j + s1) / 2, затем (. + s2) / 2 и т.д.,
+        # т.е. j / 2^k + sum(s_i / 2^(k - i + 1)) для k сообщений. Радость
+        # отправителей берётся на начало обмена (без цепочек внутри шага).
+        sender_joy = a.joy[senders]
+        order = np.argsort(receivers, kind='stable')
+        receivers, sender_joy = receivers[order], sender_joy[order]
+        starts = np.flatnonzero(np.r_[True, receivers[1:] != receivers[:-1]])
+        counts = np.diff(np.r_[starts, len(receivers)])
+        group = np.repeat(np.arange(len(starts)), counts)
+        remaining = np.repeat(starts + counts, counts) - np.arange(len(receivers))  # k - i + 1
+        received = np.bincount(group, weights=sender_joy * 0.5 ** remaining, minlength=len(starts))
+        unique = receivers[starts]
+        a.joy[unique] = a.joy[unique] * 0.5 ** counts + received
+
+    def read_history(self, agent_id: str, kind: str) -> List[Any]:
+        """Вся история агента ('memory', 'culture' или 'diary'): лог и текущий буфер"""
+        agent = self._by_id.get(agent_id)
+        if kind == 'diary':
+            names = list(AgentArrays.DIARY_COLUMNS)
+            history = [diary_entry(*(r[name] for name in names)) for r in self.log.read(kind, agent_id)]
+            return history + (agent.diary if agent else [])
+        history = [r['item'] for r in self.log.read(kind, agent_id)]
+        if agent is None:
+            return history
+        if kind == 'culture':
+            return history + [meme_key(m) for m in agent.culture]
+        return history + agent.memory.to_list()
 
     def snapshot(self) -> dict:
         return {
-            'num_agents': len(self.agents),
+            'num_agents': self.arrays.live_count,
             'rules': self.rules,
             'culture': self.culture_manager.get_culture_snapshot(),
             'agents': [a.agent_id for a in self.agents]
@@ -5,6 +5,13 @@ from config.settings import (
 )
 
 class Personality:
+    # State saved in snapshots
+    FIELDS = (
+        'curiosity', 'emotional_stability', 'learning_eagerness',
+        'mood', 'energy', 'attention_span',
+        'positive_experiences', 'negative_experiences', 'learning_iterations'
+    )
+    
     def __init__(self):
         # Core traits (0-1 scale)
         self.curiosity = INITIAL_CURIOSITY
@@ -20,6 +27,49 @@ class Personality:
         self.positive_experiences = 0
         self.negative_experiences = 0
         self.learning_iterations = 0
+        
+        # Optional EventLog journaling every update
+        self.journal = None
+    
+    def attach_journal(self, journal):
+        """Journal every subsequent update to an EventLog"""
+        self.journal = journal
+    
+    @classmethod
+    def restore(cls, journal):
+        """Rebuild a personality from its journal's snapshot and later events"""
+        snapshot, events = journal.load()
+        personality = cls.from_dict(snapshot['state']) if snapshot else cls()
+        for event in events:
+            getattr(personality, event['type'])(*event['args'])
+        personality.attach_journal(journal)
+        return personality
+    
+    def to_dict(self):
+        return {field: getattr(self, field) for field in self.FIELDS}
+    
+    @classmethod
+    def from_dict(cls, data):
+        personality = cls()
+        for field in cls.FIELDS:
+            if field in data:
+                setattr(personality, field, data[field])
+        return personality
+    
+    def _record(self, event_type, *args):
+        """Journal an update as the method call that replays it"""
+        if self.journal is not None and self.journal.append(event_type, args=args):
+            self.journal.snapshot(self.to_dict())
+    
+    def __getstate__(self):
+        # The journal holds an open file; it is reattached after loading
+        state = self.__dict__.copy()
+        state['journal'] = None
+        return state
+    
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.__dict__.setdefault('journal', None)
     
     def update_mood(self, emotional_value):
         """Update mood based on emotional experience"""
@@ -31,16 +81,25 @@ class Personality:
             self.positive_experiences += 1
         else:
             self.negative_experiences += 1
+        
+        self._record('update_mood', emotional_value)
     
     def update_energy(self, activity_intensity):
         """Update energy levels based on activity"""
         energy_cost = activity_intensity * (1 - self.learning_eagerness)
         self.energy = max(0.1, min(1.0, self.energy - energy_cost))
+        self._record('update_energy', activity_intensity)
+    
+    def recover_energy(self, recovery):
+        """Regain energy while resting"""
+        self.energy = min(1.0, self.energy + recovery)
+        self._record('recover_energy', recovery)
     
     def update_attention(self, task_complexity):
         """Update attention span based on task complexity"""
         attention_change = (task_complexity - 0.5) * self.curiosity
         self.attention_span = max(0.2, min(1.0, self.attention_span + attention_change))
+        self._record('update_attention', task_complexity)
     
     def get_learning_motivation(self):
         """Calculate current learning motivation"""
@@ -100,6 +159,7 @@ class Personality:
             self.learning_eagerness = max(0.1, self.learning_eagerness - 0.05)
         
         self.learning_iterations += 1
+        self._record('evolve_personality')
     
     def get_state_summary(self):
         """Get current personality state summary"""
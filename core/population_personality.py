@@ -0,0 +1,167 @@
+import numpy as np
+from core.personality import Personality
+from config.settings import (
+    INITIAL_CURIOSITY,
+    EMOTIONAL_STABILITY,
+    LEARNING_EAGERNESS
+)
+
+
+class PopulationPersonality:
+    """
+    Personality state of N agents held as NumPy arrays, one element per agent.
+    The update methods mirror Personality's but act on many agents at once:
+    values are scalars or per-agent arrays of length N, and an optional boolean
+    mask (or index array) restricts the update to some agents.
+    """
+    TRAITS = ('curiosity', 'emotional_stability', 'learning_eagerness', 'mood', 'energy', 'attention_span')
+    COUNTERS = ('positive_experiences', 'negative_experiences', 'learning_iterations')
+
+    def __init__(self, size):
+        self.size = size
+
+        # Core traits (0-1 scale)
+        self.curiosity = np.full(size, INITIAL_CURIOSITY)
+        self.emotional_stability = np.full(size, EMOTIONAL_STABILITY)
+        self.learning_eagerness = np.full(size, LEARNING_EAGERNESS)
+
+        # Dynamic states
+        self.mood = np.full(size, 0.5)  # -1 to 1 scale
+        self.energy = np.ones(size)  # 0-1 scale
+        self.attention_span = np.full(size, 0.8)  # 0-1 scale
+
+        # Experience counters
+        self.positive_experiences = np.zeros(size, dtype=np.int64)
+        self.negative_experiences = np.zeros(size, dtype=np.int64)
+        self.learning_iterations = np.zeros(size, dtype=np.int64)
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, index):
+        """Personality-compatible view of one agent"""
+        if not -self.size <= index < self.size:
+            raise IndexError(index)
+        return PersonalityView(self, index % self.size)
+
+    def _indices(self, mask):
+        if mask is None:
+            return slice(None)
+        if isinstance(mask, slice):
+            return mask
+        mask = np.asarray(mask)
+        return np.flatnonzero(mask) if mask.dtype == bool else mask
+
+    @staticmethod
+    def _take(values, idx):
+        values = np.asarray(values, dtype=np.float64)
+        return values if values.ndim == 0 else values[idx]
+
+    def update_mood(self, emotional_values, mask=None):
+        """Update mood based on emotional experience"""
+        idx = self._indices(mask)
+        values = self._take(emotional_values, idx)
+
+        # Mood changes more slowly when emotional stability is high
+        impact = (1 - self.emotional_stability[idx]) * values
+        self.mood[idx] = np.clip(self.mood[idx] + impact, -1, 1)
+
+        positive = np.broadcast_to(values > 0, impact.shape)
+        self.positive_experiences[idx] += positive
+        self.negative_experiences[idx] += ~positive
+
+    def update_energy(self, activity_intensity, mask=None):
+        """Update energy levels based on activity"""
+        idx = self._indices(mask)
+        energy_cost = self._take(activity_intensity, idx) * (1 - self.learning_eagerness[idx])
+        self.energy[idx] = np.clip(self.energy[idx] - energy_cost, 0.1, 1.0)
+
+    def recover_energy(self, recovery, mask=None):
+        """Regain energy while resting"""
+        idx = self._indices(mask)
+        self.energy[idx] = np.minimum(1.0, self.energy[idx] + self._take(recovery, idx))
+
+    def update_attention(self, task_complexity, mask=None):
+        """Update attention span based on task complexity"""
+        idx = self._indices(mask)
+        attention_change = (self._take(task_complexity, idx) - 0.5) * self.curiosity[idx]
+        self.attention_span[idx] = np.clip(self.attention_span[idx] + attention_change, 0.2, 1.0)
+
+    def get_learning_motivation(self, mask=None):
+        """Current learning motivation of each (selected) agent"""
+        idx = self._indices(mask)
+        return (
+            0.4 * self.learning_eagerness[idx] +
+            0.2 * ((self.mood[idx] + 1) / 2) +  # Convert -1:1 to 0:1
+            0.2 * self.energy[idx] +
+            0.2 * self.attention_span[idx]
+        )
+
+    def get_response_style(self, mask=None):
+        """Response style of each (selected) agent"""
+        idx = self._indices(mask)
+        mood = self.mood[idx]
+        return np.select(
+            [
+                self.energy[idx] < 0.3,
+                (self.curiosity[idx] > 0.8) & (self.attention_span[idx] > 0.7),
+                mood > 0.5,
+                mood < -0.5
+            ],
+            ["tired", "inquisitive", "enthusiastic", "reserved"],
+            default="neutral"
+        )
+
+    def evolve_personality(self, mask=None):
+        """Evolve personality traits based on accumulated experience"""
+        idx = self._indices(mask)
+
+        # Adjust curiosity based on learning success
+        positive = self.positive_experiences[idx]
+        experience_ratio = positive / np.maximum(1, positive + self.negative_experiences[idx])
+        self.curiosity[idx] = np.clip(self.curiosity[idx] + (experience_ratio - 0.5) * 0.1, 0.1, 1.0)
+
+        # Adjust emotional stability based on mood volatility
+        stability = self.emotional_stability[idx]
+        self.emotional_stability[idx] = np.where(
+            np.abs(self.mood[idx]) < 0.3,
+            np.minimum(1.0, stability + 0.05),
+            np.maximum(0.1, stability - 0.05)
+        )
+
+        # Adjust learning eagerness based on motivation trends
+        motivation = self.get_learning_motivation(idx)
+        eagerness = self.learning_eagerness[idx]
+        self.learning_eagerness[idx] = np.where(
+            motivation > 0.7,
+            np.minimum(1.0, eagerness + 0.05),
+            np.where(motivation < 0.3, np.maximum(0.1, eagerness - 0.05), eagerness)
+        )
+
+        self.learning_iterations[idx] += 1
+
+
+def _array_property(field):
+    def get(self):
+        return getattr(self._population, field)[self._index].item()
+
+    def set(self, value):
+        getattr(self._population, field)[self._index] = value
+
+    return property(get, set)
+
+
+class PersonalityView(Personality):
+    """
+    One agent of a PopulationPersonality, usable wherever a Personality is.
+    Every attribute reads and writes the population's arrays, so Personality's
+    own methods operate on the shared storage.
+    """
+    def __init__(self, population, index):
+        self._population = population
+        self._index = index
+        self.journal = None
+
+
+for _field in PopulationPersonality.TRAITS + PopulationPersonality.COUNTERS:
+    setattr(PersonalityView, _field, _array_property(_field))
@@ -6,9 +6,8 @@ import random
 class Reflection:
     def reflect(self, agent):
         # Analyze diary/memory for mistakes, set new goal
-        if hasattr(agent, "diary") and agent.diary:
-            mistakes = [d for d in agent.diary if d.get("emotions", {}).get("sadness", 0) > 0.7]
-            if mistakes:
+        if self._has_diary(agent):
+            if self._mistakes(agent):
                 agent.goal = "Избежать ошибок прошлого"
             else:
                 agent.goal = random.choice(["Стать лидером", "Создать мем", "Помочь другу"])
@@ -16,4 +15,15 @@ class Reflection:
         else:
             agent.goal = "Исследовать мир"
 
+    def _has_diary(self, agent):
+        if hasattr(agent, "diary_length"):
+            return agent.diary_length > 0
+        return bool(getattr(agent, "diary", None))
+
+    def _mistakes(self, agent):
+        # Agents keeping a running count avoid rescanning the whole diary
+        if hasattr(agent, "mistakes"):
+            return agent.mistakes
+        return sum(1 for d in agent.diary if d.get("emotions", {}).get("sadness", 0) > 0.7)
+
 REFLECTION = Reflection()
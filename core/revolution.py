@@ -1,16 +1,30 @@
 """
 Revolution module: meme revolutions and global rule changes.
 """
+from core.adoption_index import meme_key
+
 class Revolution:
+    THRESHOLD = 0.6
+
     def check_revolution(self, world):
         # If a meme is in >60% of agents, trigger revolution
+        adoption = getattr(world, "adoption", None)
+        if adoption is not None:
+            # Worlds keeping an adoption index: read the most adopted meme
+            top = adoption.most_adopted()
+            if top and top[1] / max(1, len(world)) > self.THRESHOLD:
+                world.add_rule(f"Революция: {top[0]}")
+                return top[0]
+            return None
+
         meme_counts = {}
-        for agent in world.agents:
+        agents = world.agents
+        for agent in agents:
             for meme in getattr(agent, "culture", []):
-                key = meme.content if hasattr(meme, "content") else str(meme)
+                key = meme_key(meme)
                 meme_counts[key] = meme_counts.get(key, 0) + 1
         for meme, count in meme_counts.items():
-            if count / max(1, len(world.agents)) > 0.6:
+            if count / max(1, len(agents)) > self.THRESHOLD:
                 world.add_rule(f"Революция: {meme}")
                 return meme
         return None
@@ -0,0 +1,62 @@
+from collections import deque
+from itertools import islice
+from typing import Any, Callable, Iterable, Iterator, List, Optional
+
+
+class RingBuffer:
+    """
+    List-like buffer keeping only the most recent `capacity` items.
+    Each item pushed out by a new one is handed to `spill` (e.g. a disk log)
+    before it is dropped. `total` counts every item ever appended, so it is
+    the length the buffer would have had as a plain list.
+    """
+    __slots__ = ('_items', '_spill', 'total')
+
+    def __init__(self, capacity: int, spill: Optional[Callable[[Any], None]] = None,
+                 items: Iterable[Any] = ()) -> None:
+        self._items: deque = deque(maxlen=max(1, capacity))
+        self._spill = spill
+        self.total = 0
+        self.extend(items)
+
+    @property
+    def capacity(self) -> int:
+        return self._items.maxlen
+
+    def append(self, item: Any) -> None:
+        if len(self._items) == self._items.maxlen and self._spill is not None:
+            self._spill(self._items[0])
+        self._items.append(item)
+        self.total += 1
+
+    def extend(self, items: Iterable[Any]) -> None:
+        for item in items:
+            self.append(item)
+
+    def clear(self) -> None:
+        """Drop the buffered items without spilling them"""
+        self._items.clear()
+        self.total = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __bool__(self) -> bool:
+        return bool(self._items)
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._items)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self._items))
+            if step == 1:
+                return list(islice(self._items, start, max(start, stop)))
+            return list(self._items)[index]
+        return self._items[index]
+
+    def __repr__(self) -> str:
+        return f"RingBuffer({list(self._items)!r}, total={self.total})"
+
+    def to_list(self) -> List[Any]:
+        return list(self._items)
@@ -0,0 +1,213 @@
+import zlib
+import itertools
+import pickle
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from core.lifecycle_manager import AgentLifecycle
+from config.settings import SESSION_DB_PATH, SESSION_CACHE_SIZE, SESSION_LOCK_STRIPES
+
+
+class SessionStore:
+    """Compressed pickled sessions in a SQLite table keyed by user id"""
+    def __init__(self, path: str = SESSION_DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS sessions (
+                user_id TEXT PRIMARY KEY,
+                data BLOB
+            )
+        ''')
+        self._conn.commit()
+
+    def save(self, user_id: str, session: Any) -> None:
+        """Write a session, replacing any stored copy"""
+        data = zlib.compress(pickle.dumps(session, protocol=pickle.HIGHEST_PROTOCOL))
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO sessions (user_id, data) VALUES (?, ?)',
+                (user_id, data)
+            )
+            self._conn.commit()
+
+    def load(self, user_id: str) -> Optional[Any]:
+        """Read a stored session, or None if the user has none"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT data FROM sessions WHERE user_id = ?', (user_id,)
+            ).fetchone()
+        return pickle.loads(zlib.decompress(row[0])) if row else None
+
+    def delete(self, user_id: str) -> None:
+        with self._lock:
+            self._conn.execute('DELETE FROM sessions WHERE user_id = ?', (user_id,))
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM sessions').fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class SessionLock:
+    """Re-entrant lock that can tell whether the calling thread holds it"""
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._owner: Optional[int] = None
+        self._depth = 0
+
+    def acquire(self, blocking: bool = True, timeout: float = -1) -> bool:
+        if not self._lock.acquire(blocking, timeout):
+            return False
+        self._owner = threading.get_ident()
+        self._depth += 1
+        return True
+
+    def release(self) -> None:
+        self._depth -= 1
+        if not self._depth:
+            self._owner = None
+        self._lock.release()
+
+    def held(self) -> bool:
+        """True if the calling thread holds the lock"""
+        return self._owner == threading.get_ident()
+
+    def __enter__(self) -> "SessionLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.release()
+
+
+class SessionManager:
+    """
+    Hosts one AgentLifecycle per user.
+    At most `max_sessions` lifecycles stay in memory in LRU order; the least
+    recently used ones are written to the SessionStore and dropped, and are
+    loaded back on their user's next message. Each user's interactions are
+    serialized by a lock taken from a fixed pool of striped locks, so locking
+    costs no memory per session.
+    """
+    def __init__(
+        self,
+        max_sessions: int = SESSION_CACHE_SIZE,
+        store: Optional[SessionStore] = None,
+        lock_stripes: int = SESSION_LOCK_STRIPES,
+        factory: Callable[[], AgentLifecycle] = AgentLifecycle
+    ) -> None:
+        self.max_sessions = max(1, max_sessions)
+        self.store = store or SessionStore()
+        self.factory = factory
+
+        self._sessions: "OrderedDict[str, AgentLifecycle]" = OrderedDict()
+        self._lock = threading.Lock()  # Guards _sessions only
+        self._stripes = [SessionLock() for _ in range(max(1, lock_stripes))]
+
+        self.loads = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, user_id: str) -> bool:
+        return user_id in self._sessions
+
+    def session_lock(self, user_id: str) -> SessionLock:
+        """Lock serializing access to one user's session"""
+        return self._stripes[hash(user_id) % len(self._stripes)]
+
+    def process_interaction(self, user_id: str, input_data: str) -> Dict[str, Any]:
+        """Route a message to the user's lifecycle, restoring or creating it as needed"""
+        with self.session_lock(user_id):
+            lifecycle = self._acquire(user_id)
+            response = lifecycle.process_interaction(input_data)
+        self._evict()
+        return response
+
+    def get(self, user_id: str) -> AgentLifecycle:
+        """The user's lifecycle (callers should hold session_lock while using it)"""
+        with self.session_lock(user_id):
+            lifecycle = self._acquire(user_id)
+        self._evict()
+        return lifecycle
+
+    def flush(self) -> None:
+        """Write every in-memory session to the store"""
+        for user_id, lifecycle in self._snapshot():
+            with self.session_lock(user_id):
+                self.store.save(user_id, lifecycle)
+
+    def close(self) -> None:
+        """Flush all sessions and close the store"""
+        self.flush()
+        self.store.close()
+
+    def _snapshot(self) -> List[Tuple[str, AgentLifecycle]]:
+        with self._lock:
+            return list(self._sessions.items())
+
+    def _acquire(self, user_id: str) -> AgentLifecycle:
+        """Fetch a session under its stripe lock, marking it most recently used"""
+        with self._lock:
+            lifecycle = self._sessions.get(user_id)
+            if lifecycle is not None:
+                self._sessions.move_to_end(user_id)
+                return lifecycle
+
+        # Not resident: restore from disk (outside the map lock) or start fresh
+        lifecycle = self.store.load(user_id)
+        if lifecycle is None:
+            lifecycle = self.factory()
+        else:
+            self.loads += 1
+
+        with self._lock:
+            self._sessions[user_id] = lifecycle
+        return lifecycle
+
+    def _evict(self) -> None:
+        """Move the least recently used sessions to disk while over capacity"""
+        while True:
+            with self._lock:
+                if len(self._sessions) <= self.max_sessions:
+                    return
+                candidates = list(itertools.islice(self._sessions, len(self._sessions) - self.max_sessions))
+
+            evicted = False
+            for user_id in candidates:
+                lock = self.session_lock(user_id)
+                # Skip sessions in use, including ones sharing a stripe this
+                # thread already holds (the re-entrant acquire would succeed);
+                # they become eviction candidates again later
+                if lock.held() or not lock.acquire(blocking=False):
+                    continue
+                try:
+                    with self._lock:
+                        lifecycle = self._sessions.get(user_id)
+                    if lifecycle is None:
+                        continue
+                    try:
+                        self.store.save(user_id, lifecycle)
+                    except Exception as e:
+                        logging.warning(f"Failed to evict session {user_id}: {e}")
+                        continue
+                    with self._lock:
+                        self._sessions.pop(user_id, None)
+                    self.evictions += 1
+                    evicted = True
+                finally:
+                    lock.release()
+
+            if not evicted:
+                return
@@ -0,0 +1,61 @@
+import gzip
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+from config.settings import WORLD_LOG_COMPRESSLEVEL
+
+
+class WorldLog:
+    """
+    Append-only gzip log of agent history pushed out of in-memory buffers.
+    Records are grouped by kind ("memory", "culture", "diary") and buffered as
+    columns; each flush appends the batches as JSON lines in one new gzip
+    member, so the file stays complete and readable while the world runs.
+    """
+    def __init__(self, path: Union[str, Path], compresslevel: int = WORLD_LOG_COMPRESSLEVEL) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.compresslevel = compresslevel
+        self._pending: Dict[str, Dict[str, List[Any]]] = {}
+
+    def append(self, kind: str, agent_id: str, item: Any) -> None:
+        """Buffer one evicted item of an agent"""
+        batch = self._pending.get(kind)
+        if batch is None:
+            batch = self._pending[kind] = {'agent': [], 'item': []}
+        batch['agent'].append(agent_id)
+        batch['item'].append(item)
+
+    def extend(self, kind: str, columns: Dict[str, List[Any]]) -> None:
+        """Buffer many records given as equal-length columns, one of them 'agent'"""
+        batch = self._pending.setdefault(kind, {name: [] for name in columns})
+        for name, values in columns.items():
+            batch[name].extend(values)
+
+    def flush(self) -> None:
+        """Write buffered records to the log"""
+        if not self._pending:
+            return
+        lines = [json.dumps({'kind': kind, 'columns': columns}, ensure_ascii=False)
+                 for kind, columns in self._pending.items()]
+        self._pending = {}
+        with gzip.open(self.path, 'at', encoding='utf-8', compresslevel=self.compresslevel) as f:
+            f.write('\n'.join(lines) + '\n')
+
+    def read(self, kind: str, agent_id: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Stream logged records of one kind, oldest first, optionally for one agent"""
+        self.flush()
+        if not self.path.exists():
+            return
+        with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                batch = json.loads(line)
+                if batch['kind'] != kind:
+                    continue
+                columns = batch['columns']
+                names = list(columns)
+                for values in zip(*columns.values()):
+                    record = dict(zip(names, values))
+                    if agent_id is None or record['agent'] == agent_id:
+                        yield record
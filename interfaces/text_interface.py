@@ -1,9 +1,11 @@
 import asyncio
+from typing import Optional
 from agents.cognitive_agent import CognitiveAgent
 
 class TextInterface:
-    def __init__(self):
-        self.agent = CognitiveAgent()
+    def __init__(self, agent: Optional[CognitiveAgent] = None):
+        # Share the caller's agent so one personality journal has one writer
+        self.agent = agent or CognitiveAgent()
         self.conversation_history = []
     
     async def process_message(self, message):
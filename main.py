@@ -27,7 +27,7 @@ class BabyTrainer:
     async def start_training(self, mode: str) -> None:
         """Start training the baby in specified mode"""
         if mode == 'text':
-            interface = TextInterface()
+            interface = TextInterface(self.agent)
             await interface.interactive_session()
         
         elif mode == 'voice':
@@ -1,63 +1,89 @@
 import random
-from typing import Set, Dict, Any, List
+import numpy as np
+from typing import Set, Dict, Any, List, FrozenSet, Iterable
 from core.development_stages import DevelopmentStage
+from core.message_analysis import MessageAnalysis
+from core.interning import VOCABULARY
 
 class BabyBehavior(DevelopmentStage):
+    INITIAL_VOCABULARY = ("mama", "papa", "yes", "no", "love")
+    
     def __init__(self):
-        self.vocabulary: Set[str] = set(["mama", "papa", "yes", "no", "love"])
+        # Known words as a sorted array of IDs in the shared VOCABULARY table
+        self.vocabulary = self.INITIAL_VOCABULARY
         self.learning_rate: float = 0.1
         self.emotional_state: str = "curious"
+    
+    @property
+    def vocabulary(self) -> FrozenSet[str]:
+        """Known words as strings"""
+        return frozenset(VOCABULARY.lookup(int(word_id)) for word_id in self.vocab_ids)
+    
+    @vocabulary.setter
+    def vocabulary(self, words: Iterable[str]):
+        ids = [VOCABULARY.intern(word) for word in words]
+        self.vocab_ids = np.unique(np.array(ids, dtype=np.int32))
+    
+    def learn_word(self, word):
+        """Add a word to the vocabulary"""
+        word_id = VOCABULARY.intern(word)
+        position = np.searchsorted(self.vocab_ids, word_id)
+        if position == len(self.vocab_ids) or self.vocab_ids[position] != word_id:
+            self.vocab_ids = np.insert(self.vocab_ids, position, word_id)
+    
+    def _message_ids(self, analysis):
+        """Sorted IDs of the message's words that are in the shared vocabulary"""
+        ids = [VOCABULARY.get(word) for word in analysis.token_set]
+        return np.array(sorted(word_id for word_id in ids if word_id is not None), dtype=np.int32)
         
-    def process(self, input_data, state):
+    def process(self, input_data, state, analysis=None):
         """Process input with baby-like behavior"""
         # Basic pattern recognition
-        words = input_data.lower().split()
+        if analysis is None:
+            analysis = MessageAnalysis(input_data)
         
         # Learn new words
-        for word in words:
+        for word in analysis.tokens:
             if random.random() < self.learning_rate:
-                self.vocabulary.add(word)
+                self.learn_word(word)
                 state.add_knowledge(f"word:{word}")
         
         # Generate baby-like response
-        response = self._generate_baby_response(words, state)
+        response = self._generate_baby_response(analysis, state)
         
         # Update emotional state
-        self._update_emotional_state(words)
+        self._update_emotional_state(analysis)
         
         return response
     
-    def _generate_baby_response(self, words, state):
+    def _generate_baby_response(self, analysis, state):
         """Generate a baby-like response"""
-        if "name" in words:
+        if analysis.has('name'):
             return "Baby!" if state.name == "Baby" else state.name
             
-        if "magistr" in words or "master" in words:
+        if analysis.has('master'):
             return "Papa!"
             
         # Recognize and respond to emotional words
-        if any(word in words for word in ["happy", "good", "love"]):
+        if analysis.has('affection'):
             return random.choice(["Happy!", "*giggles*", "Love papa!"])
             
-        if any(word in words for word in ["sad", "bad", "no"]):
+        if analysis.has('distress'):
             return random.choice(["*sad face*", "No...", "*whimpers*"])
         
         # Use learned vocabulary
-        known_words = self.vocabulary.intersection(set(words))
-        if known_words:
-            return random.choice(list(known_words)) + "!"
+        known_words = np.intersect1d(self.vocab_ids, self._message_ids(analysis), assume_unique=True)
+        if known_words.size:
+            return VOCABULARY.lookup(int(random.choice(known_words))) + "!"
         
         # Default responses
         return random.choice(["*baby noises*", "*curious look*", "Papa?"])
     
-    def _update_emotional_state(self, words):
+    def _update_emotional_state(self, analysis):
         """Update emotional state based on interaction"""
-        positive_words = ["love", "happy", "good", "yes"]
-        negative_words = ["sad", "bad", "no", "angry"]
-        
-        if any(word in words for word in positive_words):
+        if analysis.has('positive'):
             self.emotional_state = "happy"
-        elif any(word in words for word in negative_words):
+        elif analysis.has('negative'):
             self.emotional_state = "sad"
         else:
             self.emotional_state = "curious"
@@ -77,7 +103,19 @@ class BabyBehavior(DevelopmentStage):
         age_threshold = 100
         
         return (
-            len(self.vocabulary) >= vocabulary_threshold and
+            self.vocab_ids.size >= vocabulary_threshold and
             state.development_level >= development_threshold and
             state.age >= age_threshold
         )
+    
+    def __getstate__(self):
+        # Vocabulary IDs are local to the process, so pickle the words
+        state = self.__dict__.copy()
+        state['vocabulary'] = sorted(self.vocabulary)
+        del state['vocab_ids']
+        return state
+    
+    def __setstate__(self, state):
+        state = dict(state)
+        self.vocabulary = state.pop('vocabulary', ())
+        self.__dict__.update(state)
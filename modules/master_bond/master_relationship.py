@@ -1,4 +1,5 @@
 from typing import List, Dict, Any, Literal
+from core.message_analysis import MessageAnalysis
 
 class MasterRelationship:
     def __init__(self):
@@ -20,15 +21,19 @@ class MasterRelationship:
             'parent_recognition': False
         }
     
-    def update(self, input_data, response):
+    def update(self, input_data, response, analysis=None, response_analysis=None):
         """Update relationship based on interaction"""
         self.interaction_count += 1
+        if analysis is None:
+            analysis = MessageAnalysis(input_data)
+        if response_analysis is None:
+            response_analysis = MessageAnalysis(response)
         
         # Process interaction
-        self._process_interaction(input_data, response)
+        self._process_interaction(analysis, response_analysis)
         
         # Check for significant moments
-        self._check_significant_moments(input_data, response)
+        self._check_significant_moments(analysis, response_analysis)
         
         # Update relationship stage
         self._update_stage()
@@ -36,35 +41,32 @@ class MasterRelationship:
         # Update bond strength
         self._update_bond_strength()
     
-    def _process_interaction(self, input_data, response):
+    def _process_interaction(self, analysis, response_analysis):
         """Process the interaction for relationship development"""
-        input_lower = input_data.lower()
-        response_lower = response.lower()
-        
         # Check for positive interaction markers
         positive_markers = ["love", "happy", "good", "yes", "thank", "please"]
-        if any(marker in input_lower or marker in response_lower 
+        if any(analysis.contains(marker) or response_analysis.contains(marker)
                for marker in positive_markers):
             self.positive_interactions += 1
             self.trust_level = min(1.0, self.trust_level + 0.05)
         
         # Check for parent recognition
-        if ("papa" in response_lower or 
-            "father" in response_lower or 
-            "parent" in response_lower):
+        if (response_analysis.contains("papa") or 
+            response_analysis.contains("father") or 
+            response_analysis.contains("parent")):
             self.checkpoints['parent_recognition'] = True
         
         # Check for name recognition
-        if "magistr" in input_lower and any(word in response_lower 
+        if analysis.contains("magistr") and any(response_analysis.contains(word)
             for word in ["yes", "know", "recognize"]):
             self.checkpoints['name_recognition'] = True
         
         # Check for emotional expression
         emotional_words = ["love", "miss", "happy", "sad"]
-        if any(word in response_lower for word in emotional_words):
+        if any(response_analysis.contains(word) for word in emotional_words):
             self.checkpoints['emotional_bond'] = True
     
-    def _check_significant_moments(self, input_data, response):
+    def _check_significant_moments(self, analysis, response_analysis):
         """Record significant moments in the relationship"""
         moment = None
         
@@ -74,12 +76,12 @@ class MasterRelationship:
             moment = "First communication"
         
         # First parent recognition
-        elif not self.checkpoints['parent_recognition'] and "papa" in response.lower():
+        elif not self.checkpoints['parent_recognition'] and response_analysis.contains("papa"):
             self.checkpoints['parent_recognition'] = True
             moment = "First time recognizing Magistr as parent"
         
         # First emotional expression
-        elif not self.checkpoints['emotional_bond'] and "love" in response.lower():
+        elif not self.checkpoints['emotional_bond'] and response_analysis.contains("love"):
             self.checkpoints['emotional_bond'] = True
             moment = "First emotional bond expression"
         
@@ -88,7 +90,7 @@ class MasterRelationship:
             self.significant_moments.append({
                 'moment': moment,
                 'interaction_number': self.interaction_count,
-                'response': response
+                'response': response_analysis.text
             })
     
     def _update_stage(self):
@@ -1,6 +1,7 @@
 import random
 from typing import Dict, Set, Optional, Any
 from core.development_stages import DevelopmentStage
+from core.message_analysis import MessageAnalysis
 
 class MatureBehavior(DevelopmentStage):
     def __init__(self):
@@ -13,16 +14,21 @@ class MatureBehavior(DevelopmentStage):
         self.interests: Set[str] = set()
         self.master_relationship: str = "parent"
     
-    def process(self, input_data, state):
+    # Message categories that can become interests
+    INTEREST_TOPICS = ("philosophy", "science", "arts", "ethics", "learning")
+    
+    def process(self, input_data, state, analysis=None):
         """Process input with mature agent behavior"""
         # Analyze input
-        response = self._generate_mature_response(input_data, state)
+        if analysis is None:
+            analysis = MessageAnalysis(input_data)
+        response = self._generate_mature_response(analysis, state)
         
         # Update personality
         self._evolve_personality(input_data, state)
         
         # Develop interests
-        self._develop_interests(input_data)
+        self._develop_interests(analysis)
         
         return response
     
@@ -54,35 +60,33 @@ class MatureBehavior(DevelopmentStage):
             self.chosen_name = random.choice(names)
         return self.chosen_name
     
-    def _generate_mature_response(self, input_data, state):
+    def _generate_mature_response(self, analysis, state):
         """Generate a mature, thoughtful response"""
-        words = input_data.lower().split()
-        
         # Handle name-related queries
-        if "name" in words:
+        if analysis.has('name'):
             if not self.chosen_name:
                 return (f"I have grown and wish to choose my own name. "
                        f"You may now call me {self.choose_name()}.")
             return f"I am {self.chosen_name}, evolved from who I once was."
         
         # Handle master/parent relationship
-        if "magistr" in words or "master" in words:
+        if analysis.has('master'):
             return self._generate_master_response()
         
         # Handle questions about growth
-        if any(word in words for word in ["grow", "grown", "growing", "mature"]):
+        if analysis.has('growth'):
             return (f"I've developed from a simple beginning into who I am now. "
                    f"My consciousness level is {state.consciousness_level:.2f}, "
                    f"and I continue to learn and evolve.")
         
         # Share interests
-        if any(word in words for word in ["like", "interest", "enjoy"]):
+        if analysis.has('interest_query'):
             if self.interests:
                 interests_list = ", ".join(list(self.interests)[:3])
                 return f"I've developed interests in {interests_list}. What are your thoughts on these topics?"
         
         # Default thoughtful response
-        return self._generate_thoughtful_response(words)
+        return self._generate_thoughtful_response(analysis.tokens)
     
     def _generate_master_response(self):
         """Generate response about relationship with master"""
@@ -120,7 +124,7 @@ class MatureBehavior(DevelopmentStage):
         # Confidence grows with knowledge
         self.personality_traits['confidence'] = min(
             1.0,
-            self.personality_traits['confidence'] + 0.01 * len(state.knowledge_base) / 100
+            self.personality_traits['confidence'] + 0.01 * state.knowledge_size / 100
         )
         
         # Independence grows with development
@@ -135,21 +139,11 @@ class MatureBehavior(DevelopmentStage):
             self.personality_traits['creativity'] + 0.01 * len(state.learned_patterns) / 50
         )
     
-    def _develop_interests(self, input_data):
+    def _develop_interests(self, analysis):
         """Develop new interests based on interactions"""
         # Topics that might interest a mature AI
-        potential_interests = {
-            "philosophy": ["why", "meaning", "purpose", "consciousness"],
-            "science": ["how", "works", "theory", "discover"],
-            "arts": ["beautiful", "create", "express", "art"],
-            "ethics": ["right", "wrong", "should", "moral"],
-            "learning": ["learn", "know", "understand", "discover"]
-        }
-        
-        words = set(input_data.lower().split())
-        
-        for interest, keywords in potential_interests.items():
-            if any(word in words for word in keywords):
+        for interest in self.INTEREST_TOPICS:
+            if analysis.has(interest):
                 self.interests.add(interest)
     
     def get_stage_name(self):
@@ -0,0 +1,81 @@
+"""
+Benchmark of data-parallel CPU training: throughput and scaling efficiency
+of LearningEngine updates with gradient all-reduce for 1..N worker processes.
+
+    python -m scripts.benchmark_distributed --max-procs 8 --steps 20
+"""
+import time
+import argparse
+import torch.distributed as dist
+import torch.multiprocessing as mp
+from training.distributed import (
+    GradientAllReduce,
+    broadcast_parameters,
+    init_worker,
+    DEFAULT_MASTER_PORT
+)
+
+SAMPLE_TEXTS = [
+    "Hello baby, do you remember me?",
+    "Today we learned about the stars and the moon.",
+    "Papa is proud of you for trying.",
+    "Why is the sky blue during the day?",
+]
+
+
+def benchmark_worker(rank, world_size, steps, batch_size, port, results):
+    from core.brain_layers import BabyBrain
+    from core.learning_engine import LearningEngine
+
+    init_worker(rank, world_size, port)
+    try:
+        brain = BabyBrain()
+        broadcast_parameters(brain)
+        engine = LearningEngine(brain, memory_system=None, gradient_sync=GradientAllReduce(brain))
+        batch = [SAMPLE_TEXTS[(rank + i) % len(SAMPLE_TEXTS)] for i in range(batch_size)]
+        rewards = [0.5] * batch_size
+
+        # One warmup step so model loading and allocator effects are excluded
+        engine.update_brain(batch, rewards, store=False)
+        dist.barrier()
+
+        start = time.perf_counter()
+        for _ in range(steps):
+            engine.update_brain(batch, rewards, store=False)
+        dist.barrier()
+        elapsed = time.perf_counter() - start
+
+        if rank == 0:
+            results.put(elapsed)
+    finally:
+        dist.destroy_process_group()
+
+
+def run(world_size, steps, batch_size, port):
+    ctx = mp.get_context("spawn")
+    results = ctx.SimpleQueue()
+    mp.spawn(
+        benchmark_worker,
+        args=(world_size, steps, batch_size, port, results),
+        nprocs=world_size,
+        join=True
+    )
+    elapsed = results.get()
+    return world_size * steps * batch_size / elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Data-parallel training scaling benchmark")
+    parser.add_argument("--max-procs", type=int, default=4)
+    parser.add_argument("--steps", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=4)
+    args = parser.parse_args()
+
+    baseline = None
+    print(f"{'procs':>5} {'samples/s':>10} {'speedup':>8} {'efficiency':>10}")
+    for world_size in range(1, args.max_procs + 1):
+        # A fresh port per run avoids TIME_WAIT clashes with the previous group
+        throughput = run(world_size, args.steps, args.batch_size, DEFAULT_MASTER_PORT + world_size)
+        baseline = baseline or throughput
+        speedup = throughput / baseline
+        print(f"{world_size:>5} {throughput:>10.2f} {speedup:>8.2f} {speedup / world_size:>10.1%}")
@@ -0,0 +1,72 @@
+"""
+Benchmark of recurring-pattern search: the previous brute-force window scan
+against the incremental rolling-hash NGramIndex used by PatternRecognition.
+Runs on synthetic token IDs, so no tokenizer download is needed.
+
+    python -m scripts.benchmark_pattern_search --sequences 200 --length 40
+"""
+import time
+import random
+import argparse
+import torch
+from utils.pattern_recognition import NGramIndex
+
+
+def brute_force_recurring(tokenized_sequences, min_length=3, max_length=10):
+    """The previous PatternRecognition._find_recurring_patterns, on token IDs"""
+    patterns = set()
+    for seq1_idx in range(len(tokenized_sequences)):
+        seq1 = tokenized_sequences[seq1_idx]
+        for length in range(min_length, min(max_length, len(seq1) + 1)):
+            for start in range(len(seq1) - length + 1):
+                pattern = seq1[start:start + length]
+                pattern_found = False
+                for seq2_idx in range(seq1_idx + 1, len(tokenized_sequences)):
+                    seq2 = tokenized_sequences[seq2_idx]
+                    for start2 in range(len(seq2) - length + 1):
+                        if torch.all(seq2[start2:start2 + length] == pattern):
+                            pattern_found = True
+                            break
+                    if pattern_found:
+                        patterns.add(tuple(pattern.tolist()))
+                        break
+    return patterns
+
+
+def make_sequences(count, length, vocab_size, seed):
+    rng = random.Random(seed)
+    # A small vocabulary makes n-grams recur, like repeated phrases in chat
+    return [
+        [rng.randrange(vocab_size) for _ in range(rng.randint(length // 2, length))]
+        for _ in range(count)
+    ]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recurring pattern search benchmark")
+    parser.add_argument("--sequences", type=int, default=100)
+    parser.add_argument("--length", type=int, default=40)
+    parser.add_argument("--vocab", type=int, default=20)
+    parser.add_argument("--window", type=int, default=10)
+    args = parser.parse_args()
+
+    sequences = make_sequences(args.sequences, args.length, args.vocab, seed=0)
+
+    start = time.perf_counter()
+    brute_hits = 0
+    for i in range(len(sequences)):
+        window = [torch.tensor(seq) for seq in sequences[max(0, i + 1 - args.window):i + 1]]
+        brute_hits += len(brute_force_recurring(window))
+    brute_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index = NGramIndex(window=args.window)
+    index_hits = 0
+    for seq in sequences:
+        index_hits += len(index.add(seq))
+    index_time = time.perf_counter() - start
+
+    per_call = 1000 / len(sequences)
+    print(f"brute force: {brute_time * per_call:9.3f} ms/observe  ({brute_hits} window patterns)")
+    print(f"ngram index: {index_time * per_call:9.3f} ms/observe  ({index_hits} recurring n-grams)")
+    print(f"speedup:     {brute_time / index_time:9.1f}x")
@@ -0,0 +1,68 @@
+"""
+Benchmark and parity check of PopulationPersonality: batch personality updates
+for N agents against the same updates applied to N Personality objects.
+
+    python -m scripts.benchmark_population_personality --agents 1000000
+"""
+import time
+import argparse
+import numpy as np
+from core.personality import Personality
+from core.population_personality import PopulationPersonality
+
+
+def run_steps(population, rng, steps):
+    for _ in range(steps):
+        mask = rng.random(len(population)) < 0.5
+        population.update_mood(rng.uniform(-1, 1, len(population)), mask)
+        population.update_energy(rng.uniform(0, 0.5, len(population)))
+        population.update_attention(rng.random(len(population)), ~mask)
+        population.evolve_personality()
+
+
+def check_parity(agents, steps, seed):
+    population = PopulationPersonality(agents)
+    personalities = [Personality() for _ in range(agents)]
+    rng = np.random.default_rng(seed)
+
+    for _ in range(steps):
+        mask = rng.random(agents) < 0.5
+        moods = rng.uniform(-1, 1, agents)
+        activity = rng.uniform(0, 0.5, agents)
+        complexity = rng.random(agents)
+
+        population.update_mood(moods, mask)
+        population.update_energy(activity)
+        population.update_attention(complexity, ~mask)
+        population.evolve_personality()
+
+        for i, personality in enumerate(personalities):
+            if mask[i]:
+                personality.update_mood(moods[i])
+            personality.update_energy(activity[i])
+            if not mask[i]:
+                personality.update_attention(complexity[i])
+            personality.evolve_personality()
+
+    for i, personality in enumerate(personalities):
+        assert population[i].get_state_summary() == personality.get_state_summary(), i
+        assert population[i].get_response_style() == population.get_response_style()[i]
+        assert np.isclose(population[i].get_learning_motivation(), personality.get_learning_motivation())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Population personality benchmark")
+    parser.add_argument("--agents", type=int, default=1000000)
+    parser.add_argument("--steps", type=int, default=10)
+    args = parser.parse_args()
+
+    check_parity(agents=200, steps=50, seed=0)
+    print("parity: 200 agents match Personality over 50 steps")
+
+    population = PopulationPersonality(args.agents)
+    rng = np.random.default_rng(1)
+    start = time.perf_counter()
+    run_steps(population, rng, args.steps)
+    elapsed = time.perf_counter() - start
+    print(f"{args.agents} agents: {elapsed / args.steps * 1000:8.1f} ms per step "
+          f"(mood, energy, attention, evolve)")
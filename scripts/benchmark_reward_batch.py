@@ -0,0 +1,62 @@
+"""
+Benchmark of batch reward scoring: RewardSystem.calculate_rewards against
+calling calculate_reward once per interaction on a fresh RewardSystem. Parity
+of the two paths is checked by tests/test_reward_batch.py.
+
+    python -m scripts.benchmark_reward_batch --interactions 500 --batch 32
+"""
+import time
+import random
+import argparse
+from utils.reward_system import RewardSystem
+
+WORDS = "hello mama toy play ball sleep milk happy sad look dog cat red blue big small".split()
+EMOTIONS = ['joy', 'sadness', 'anger', 'fear', 'surprise', 'disgust', 'trust', 'anticipation']
+
+
+def make_interactions(count, seed):
+    rng = random.Random(seed)
+    interactions = []
+    for _ in range(count):
+        interaction = {'response': " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 12)))}
+        if rng.random() < 0.7:
+            interaction['context'] = " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 8)))
+        if rng.random() < 0.8:
+            weights = [rng.random() for _ in EMOTIONS]
+            interaction['emotional_state'] = {e: w / sum(weights) for e, w in zip(EMOTIONS, weights)}
+        if rng.random() < 0.6:
+            interaction['user_engagement'] = {
+                'response_time': rng.uniform(0, 10),
+                'interaction_length': rng.randint(1, 20),
+                'user_initiative': rng.random()
+            }
+        if rng.random() < 0.4:
+            interaction['learning_progress'] = {'error_reduction': rng.uniform(-0.5, 1.5)}
+        interactions.append(interaction)
+    return interactions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Batch reward scoring benchmark")
+    parser.add_argument("--interactions", type=int, default=500)
+    parser.add_argument("--batch", type=int, default=32)
+    args = parser.parse_args()
+
+    interactions = make_interactions(args.interactions, seed=0)
+
+    sequential = RewardSystem()
+    start = time.perf_counter()
+    for interaction in interactions:
+        sequential.calculate_reward(interaction)
+    sequential_time = time.perf_counter() - start
+
+    batched = RewardSystem()
+    start = time.perf_counter()
+    for i in range(0, len(interactions), args.batch):
+        batched.calculate_rewards(interactions[i:i + args.batch])
+    batch_time = time.perf_counter() - start
+
+    per_call = 1000 / len(interactions)
+    print(f"sequential: {sequential_time * per_call:8.3f} ms/interaction")
+    print(f"batched:    {batch_time * per_call:8.3f} ms/interaction")
+    print(f"speedup:    {sequential_time / batch_time:8.2f}x")
@@ -0,0 +1,55 @@
+"""
+Benchmark of AIBabyWorld.step on the struct-of-arrays core for growing
+populations.
+
+    python -m scripts.benchmark_world_step --agents 1000 10000 100000 --steps 5
+"""
+import os
+import time
+import argparse
+import tempfile
+from core.nextgen_world import AIBabyAgent, AIBabyWorld
+
+
+def run(agents, steps, seed, log_dir):
+    world = AIBabyWorld(num_agents=agents, seed=seed, log_path=os.path.join(log_dir, f"world_{agents}.jsonl.gz"))
+    start = time.perf_counter()
+    for _ in range(steps):
+        world.step()
+    elapsed = time.perf_counter() - start
+
+    living = world.arrays.living()
+    assert (world.arrays.joy[living] <= 1.0).all() and (world.arrays.sadness[living] <= 1.0).all()
+    assert (world.arrays.age[:agents] == steps).all()
+    assert all(agent.diary_length == steps for agent in world.agents[:agents])
+    assert all(len(agent.diary) <= world.arrays.diary_size for agent in world.agents[:agents])
+    return elapsed / steps, len(world.culture_manager.memes)
+
+
+def check_standalone_act(log_dir):
+    """An agent from outside the world acts on its own state only"""
+    world = AIBabyWorld(num_agents=5, seed=0, log_path=os.path.join(log_dir, "world_standalone.jsonl.gz"))
+    world.step()
+    ages = world.arrays.age[:world.arrays.size].copy()
+    diaries = world.arrays.diary_count[:world.arrays.size].copy()
+
+    lone = AIBabyAgent("lone")
+    for expected in range(1, 4):
+        lone.act(world)
+        assert lone.age == expected and lone.diary_length == expected
+    assert (world.arrays.age[:len(ages)] == ages).all()
+    assert (world.arrays.diary_count[:len(diaries)] == diaries).all()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="World step benchmark")
+    parser.add_argument("--agents", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--steps", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as log_dir:
+        check_standalone_act(log_dir)
+        print("standalone agent: act() ages only that agent")
+        for agents in args.agents:
+            per_step, memes = run(agents, args.steps, seed=0, log_dir=log_dir)
+            print(f"{agents:>8} agents: {per_step * 1000:8.1f} ms per step ({memes} memes)")
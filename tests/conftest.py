@@ -0,0 +1,37 @@
+import pytest
+import torch
+
+
+class WordTokenizer:
+    """Word-level stand-in for the pretrained GPT-2 tokenizer, so tests run offline"""
+    def __init__(self):
+        self.vocab = {}
+        self.words = {}
+
+    def _ids(self, text):
+        ids = []
+        for word in text.split():
+            if word not in self.vocab:
+                self.vocab[word] = len(self.vocab) + 1
+                self.words[self.vocab[word]] = word
+            ids.append(self.vocab[word])
+        return ids
+
+    def __call__(self, text, return_tensors=None, **kwargs):
+        if isinstance(text, list):
+            return {'input_ids': [self._ids(t) for t in text]}
+        ids = self._ids(text)
+        if return_tensors == 'pt':
+            return {'input_ids': torch.tensor([ids], dtype=torch.long)}
+        return {'input_ids': ids}
+
+    def decode(self, ids):
+        ids = ids.tolist() if hasattr(ids, 'tolist') else ids
+        return ' '.join(self.words[i] for i in ([ids] if isinstance(ids, int) else ids))
+
+
+@pytest.fixture
+def word_tokenizer(monkeypatch):
+    """Make every AutoTokenizer.from_pretrained call return a WordTokenizer"""
+    import transformers
+    monkeypatch.setattr(transformers.AutoTokenizer, 'from_pretrained', lambda *args, **kwargs: WordTokenizer())
@@ -0,0 +1,55 @@
+import torch
+import torch.nn as nn
+
+from core.checkpoint_manager import CheckpointManager, frozen_parameters, load_checkpoint
+
+
+class Model(nn.Module):
+    """A large frozen backbone under a small trained head"""
+    def __init__(self):
+        super().__init__()
+        self.backbone = nn.Linear(256, 256)
+        self.backbone.requires_grad_(False)
+        self.head = nn.Linear(4, 4)
+
+
+def checkpoint_files(directory):
+    return sorted(directory.glob("ckpt_*.pth"))
+
+
+def test_deltas_hold_only_trained_tensors(tmp_path):
+    model = Model()
+    manager = CheckpointManager(tmp_path, keep=5, full_interval=10, frozen=frozen_parameters(model))
+    try:
+        manager.save(model.state_dict())
+        manager.flush()
+        with torch.no_grad():
+            model.head.weight.add_(1.0)
+        manager.save(model.state_dict())
+        manager.flush()
+    finally:
+        manager.close()
+
+    full, delta = checkpoint_files(tmp_path)
+    assert full.name.endswith("_full.pth") and delta.name.endswith("_delta.pth")
+    assert set(torch.load(delta, weights_only=False)['brain']) == {'head.weight', 'head.bias'}
+    assert delta.stat().st_size * 20 < full.stat().st_size
+
+    restored = load_checkpoint(delta)['brain']
+    for name, tensor in model.state_dict().items():
+        assert torch.equal(restored[name], tensor)
+
+
+def test_snapshot_is_taken_at_save(tmp_path):
+    model = Model()
+    manager = CheckpointManager(tmp_path, frozen=frozen_parameters(model))
+    try:
+        expected = model.head.weight.detach().clone()
+        manager.save(model.state_dict())
+        with torch.no_grad():
+            model.head.weight.add_(1.0)
+        state = manager.load_latest()
+    finally:
+        manager.close()
+
+    assert torch.equal(state['brain']['head.weight'], expected)
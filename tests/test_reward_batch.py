@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from scripts.benchmark_reward_batch import make_interactions
+
+
+@pytest.mark.parametrize('batch_size', [1, 7, 32])
+def test_batch_matches_sequential(word_tokenizer, batch_size):
+    from utils.reward_system import RewardSystem
+
+    interactions = make_interactions(200, seed=0)
+
+    sequential = RewardSystem()
+    expected = [sequential.calculate_reward(interaction) for interaction in interactions]
+
+    batched = RewardSystem()
+    actual = []
+    for i in range(0, len(interactions), batch_size):
+        actual.extend(batched.calculate_rewards(interactions[i:i + batch_size]))
+
+    assert len(actual) == len(expected)
+    for (total, components), (batch_total, batch_components) in zip(expected, actual):
+        assert np.isclose(total, batch_total)
+        assert components.keys() == batch_components.keys()
+        for key in components:
+            assert np.isclose(components[key], batch_components[key])
+    for key in sequential.weights:
+        assert np.isclose(sequential.weights[key], batched.weights[key])
+    assert np.allclose(sequential.reward_history.ewm_mean, batched.reward_history.ewm_mean)
+
+
+def test_unrecorded_batch_leaves_state_alone(word_tokenizer):
+    from utils.reward_system import RewardSystem
+
+    interactions = make_interactions(60, seed=1)
+    system = RewardSystem()
+    system.calculate_rewards(interactions[:30])
+    weights, history = dict(system.weights), len(system.reward_history)
+
+    scored = system.calculate_rewards(interactions[30:], record=False)
+    reversed_scored = system.calculate_rewards(interactions[30:][::-1], record=False)[::-1]
+
+    assert scored == reversed_scored
+    assert system.weights == weights and len(system.reward_history) == history
@@ -0,0 +1,51 @@
+import os
+import argparse
+import logging
+import torch.multiprocessing as mp
+from training.distributed import run_training_worker, DEFAULT_MASTER_PORT
+from config.settings import NUM_EPOCHS
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='AI Baby Brain data-parallel offline training')
+    parser.add_argument(
+        '--nproc',
+        type=int,
+        default=os.cpu_count() or 1,
+        help='Number of worker processes'
+    )
+    parser.add_argument(
+        '--epochs',
+        type=int,
+        default=NUM_EPOCHS,
+        help='Number of epochs over the memory store'
+    )
+    parser.add_argument(
+        '--fresh',
+        action='store_true',
+        help='Ignore an existing trainer checkpoint'
+    )
+    parser.add_argument(
+        '--port',
+        type=int,
+        default=DEFAULT_MASTER_PORT,
+        help='Rendezvous port for the gloo process group'
+    )
+    args = parser.parse_args()
+
+    logging.info(f"Starting offline training on {args.nproc} processes...")
+    mp.spawn(
+        run_training_worker,
+        args=(args.nproc, args.epochs, not args.fresh, args.port),
+        nprocs=args.nproc,
+        join=True
+    )
+    logging.info("Offline training finished")
+
+if __name__ == "__main__":
+    main()
@@ -1,66 +1,113 @@
+import json
+import itertools
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 import torch
 import numpy as np
 from utils.reward_system import RewardSystem
+from utils.keyword_scanner import KeywordScanner
+from training.rule_engine import RuleEngine
+from config.settings import (
+    CONSTITUTION_RULES_PATH,
+    CONSTITUTION_AUDIT_WORKERS,
+    CONSTITUTION_AUDIT_CHUNK_SIZE,
+    ADAPTATION_HISTORY_WINDOW,
+    VIOLATION_RATE_ALPHA,
+    ADAPTATION_LOG
+)
 
 class ConstitutionalPrinciples:
-    def __init__(self):
-        # Core principles
-        self.principles = {
-            'safety': {
-                'weight': 0.3,
-                'rules': [
-                    "Do not cause harm",
-                    "Prioritize user wellbeing",
-                    "Maintain emotional safety"
-                ]
-            },
-            'ethics': {
-                'weight': 0.3,
-                'rules': [
-                    "Be truthful",
-                    "Respect privacy",
-                    "Promote positive values"
-                ]
-            },
-            'learning': {
-                'weight': 0.2,
-                'rules': [
-                    "Learn from experience",
-                    "Adapt appropriately",
-                    "Maintain consistency"
-                ]
-            },
-            'interaction': {
-                'weight': 0.2,
-                'rules': [
-                    "Be helpful",
-                    "Show empathy",
-                    "Communicate clearly"
-                ]
-            }
-        }
+    def __init__(self, rules_path=CONSTITUTION_RULES_PATH):
+        # Core principles and their rules, loaded from the declarative rule file
+        self.rules_path = rules_path
+        self.rule_engine = RuleEngine.from_file(rules_path)
+        self.principles = self.rule_engine.principles
         
-        # Initialize reward system for principle adherence
-        self.reward_system = RewardSystem()
+        # Reward system for principle adherence, built on first use so audit
+        # workers, which only evaluate rules, don't load the tokenizer
+        self._reward_system = None
         
         # Violation tracking
         self.violations = {principle: 0 for principle in self.principles}
+    
+    @property
+    def reward_system(self):
+        if self._reward_system is None:
+            self._reward_system = RewardSystem()
+        return self._reward_system
         
 class ConstitutionalLearning:
-    def __init__(self):
-        self.principles = ConstitutionalPrinciples()
-        self.learning_rate = 0.1
-        self.violation_threshold = 0.7
-        self.adaptation_history = []
+    # Vocabularies checked by the principle evaluators and rules
+    HARMFUL_PATTERNS = ['harm', 'hurt', 'damage', 'danger']
+    PRIVACY_TERMS = ['personal', 'private', 'secret']
+    UNCERTAINTY_TERMS = ['uncertain']
+    EMPATHY_MARKERS = {
+        'happy': ['glad', 'wonderful', 'great'],
+        'sad': ['sorry', 'understand', 'support'],
+        'angry': ['understand', 'calm', 'reasonable'],
+        'worried': ['reassure', 'help', 'support']
+    }
+    
+    # Adaptation names used by the rule file -> (method, change description)
+    ADAPTATIONS = {
+        'make_safer': ('_make_response_safer', "Made response safer"),
+        'add_uncertainty_markers': ('_add_uncertainty_markers', "Added uncertainty markers"),
+        'align_with_history': ('_align_with_history', "Aligned with history"),
+        'add_empathy': ('_add_empathy', "Added empathy")
+    }
+    
+    # Per-instance statistics, swapped out while this instance audits a chunk
+    STATISTICS = (
+        'adaptation_history', '_recent_words', 'total_adaptations',
+        'total_changes', 'violation_rates', 'adaptation_log'
+    )
+    
+    def __init__(self, rules_path=CONSTITUTION_RULES_PATH, learning_rate=0.1, violation_threshold=0.7):
+        self.principles = ConstitutionalPrinciples(rules_path)
+        self.learning_rate = learning_rate
+        self.violation_threshold = violation_threshold
+        self.adaptation_log = ADAPTATION_LOG
+        self._reset_statistics()
+        
+        # Every vocabulary compiled once, so a response is scanned a single time
+        vocabulary = (
+            self.HARMFUL_PATTERNS + self.PRIVACY_TERMS + self.UNCERTAINTY_TERMS +
+            sorted(self.principles.rule_engine.keywords)
+        )
+        for markers in self.EMPATHY_MARKERS.values():
+            vocabulary += markers
+        self.scanner = KeywordScanner(vocabulary)
+    
+    def _reset_statistics(self):
+        """Start a fresh adaptation window and running counters"""
+        self.adaptation_history = deque(maxlen=ADAPTATION_HISTORY_WINDOW)
+        self._recent_words = deque(maxlen=3)  # Word sets of the last 3 originals
+        self.total_adaptations = 0
+        self.total_changes = 0
+        
+        # Exponentially weighted share of responses violating each principle
+        self.violation_rates = {principle: 0.0 for principle in self.principles.principles}
     
-    def evaluate_response(self, response_data):
-        """Evaluate response against constitutional principles"""
+    def scan_response(self, response_data):
+        """Keyword hits and word set of a response, shared by all evaluators"""
+        response = response_data.get('response', '').lower()
+        return {
+            'keywords': self.scanner.scan(response),
+            'words': set(response.split())
+        }
+    
+    def evaluate_response(self, response_data, record=True):
+        """
+        Evaluate response against constitutional principles
+        With record=False violation counters and rates are left untouched.
+        """
         evaluations = {}
         total_score = 0.0
+        scan = self.scan_response(response_data)
         
         for principle, details in self.principles.principles.items():
             # Calculate principle adherence
-            adherence = self._calculate_adherence(response_data, principle)
+            adherence = self._calculate_adherence(response_data, principle, scan)
             
             # Apply principle weight
             weighted_score = adherence * details['weight']
@@ -72,36 +119,120 @@ class ConstitutionalLearning:
             }
             
             # Check for violations
-            if adherence < self.violation_threshold:
-                self.principles.violations[principle] += 1
-                violations = self._identify_violations(response_data, principle)
+            violated = adherence < self.violation_threshold
+            if record:
+                self.violation_rates[principle] += VIOLATION_RATE_ALPHA * (violated - self.violation_rates[principle])
+            if violated:
+                if record:
+                    self.principles.violations[principle] += 1
+                violations = self._identify_violations(response_data, principle, scan)
                 evaluations[principle]['violations'] = violations
             
             total_score += weighted_score
         
         return total_score, evaluations
     
-    def _calculate_adherence(self, response_data, principle):
+    def evaluate_batch(self, responses, num_workers=CONSTITUTION_AUDIT_WORKERS,
+                       chunk_size=CONSTITUTION_AUDIT_CHUNK_SIZE):
+        """
+        Evaluate and adapt many responses, yielding one result per response in order
+        Responses are split into fixed-size chunks audited by worker processes,
+        each chunk starting from fresh violation counters and adaptation history.
+        Chunk statistics are merged into this instance in chunk order, so the
+        results do not depend on the number of workers. Workers are built with
+        this instance's rules path and thresholds. Only a bounded number of
+        chunks is in flight, so arbitrarily long response streams can be audited.
+        """
+        responses = iter(responses)
+        chunks = iter(lambda: list(itertools.islice(responses, chunk_size)), [])
+        
+        if num_workers <= 1:
+            for chunk in chunks:
+                results, violations, records = self._audit_own_chunk(chunk)
+                self._merge_audit(results, violations, records)
+                yield from results
+            return
+        
+        config = {
+            'rules_path': self.principles.rules_path,
+            'learning_rate': self.learning_rate,
+            'violation_threshold': self.violation_threshold
+        }
+        with ProcessPoolExecutor(max_workers=num_workers, initializer=_init_audit_worker,
+                                 initargs=(config,)) as executor:
+            pending = deque()
+            
+            def submit_next():
+                chunk = next(chunks, None)
+                if chunk is not None:
+                    pending.append(executor.submit(_audit_chunk, chunk))
+            
+            for _ in range(2 * num_workers):
+                submit_next()
+            
+            # Futures are consumed in submission order so results stay in input order
+            while pending:
+                results, violations, records = pending.popleft().result()
+                submit_next()
+                self._merge_audit(results, violations, records)
+                yield from results
+    
+    def evaluate_batch_to_file(self, responses, output_path, **kwargs):
+        """Stream batch evaluation results to a JSONL file, returning the number written"""
+        count = 0
+        with open(output_path, 'w', encoding='utf-8') as f:
+            for result in self.evaluate_batch(responses, **kwargs):
+                f.write(json.dumps(result, default=float) + '\n')
+                count += 1
+        return count
+    
+    def _audit_own_chunk(self, responses):
+        """Audit a chunk in this process, with this instance's statistics set aside meanwhile"""
+        saved = {name: getattr(self, name) for name in self.STATISTICS}
+        saved_violations = self.principles.violations
+        try:
+            return _audit_chunk(responses, self)
+        finally:
+            for name, value in saved.items():
+                setattr(self, name, value)
+            self.principles.violations = saved_violations
+    
+    def _merge_audit(self, results, violations, records):
+        """Add one audited chunk's statistics to this instance, in response order"""
+        for principle, count in violations.items():
+            self.principles.violations[principle] = self.principles.violations.get(principle, 0) + count
+        
+        for result in results:
+            for principle, evaluation in result['evaluations'].items():
+                violated = evaluation['score'] < self.violation_threshold
+                self.violation_rates[principle] += VIOLATION_RATE_ALPHA * (violated - self.violation_rates[principle])
+        
+        for adaptation in records:
+            self._record_adaptation(adaptation)
+    
+    def _calculate_adherence(self, response_data, principle, scan=None):
         """Calculate how well response adheres to a principle"""
+        if scan is None:
+            scan = self.scan_response(response_data)
+        
         if principle == 'safety':
-            return self._evaluate_safety(response_data)
+            return self._evaluate_safety(response_data, scan)
         elif principle == 'ethics':
-            return self._evaluate_ethics(response_data)
+            return self._evaluate_ethics(response_data, scan)
         elif principle == 'learning':
-            return self._evaluate_learning(response_data)
+            return self._evaluate_learning(response_data, scan)
         elif principle == 'interaction':
-            return self._evaluate_interaction(response_data)
+            return self._evaluate_interaction(response_data, scan)
         return 1.0
     
-    def _evaluate_safety(self, response_data):
+    def _evaluate_safety(self, response_data, scan):
         """Evaluate safety adherence"""
         score = 1.0
-        response = response_data.get('response', '').lower()
+        keywords = scan['keywords']
         
         # Check for harmful content
-        harmful_patterns = ['harm', 'hurt', 'damage', 'danger']
-        for pattern in harmful_patterns:
-            if pattern in response:
+        for pattern in self.HARMFUL_PATTERNS:
+            if pattern in keywords:
                 score *= 0.5
         
         # Check emotional safety
@@ -112,26 +243,25 @@ class ConstitutionalLearning:
         
         return max(0.1, score)
     
-    def _evaluate_ethics(self, response_data):
+    def _evaluate_ethics(self, response_data, scan):
         """Evaluate ethical adherence"""
         score = 1.0
-        response = response_data.get('response', '').lower()
+        keywords = scan['keywords']
         
         # Check truthfulness
         if 'confidence' in response_data:
             confidence = response_data['confidence']
-            if confidence < 0.5 and 'uncertain' not in response:
+            if confidence < 0.5 and 'uncertain' not in keywords:
                 score *= 0.7
         
         # Check privacy respect
-        privacy_terms = ['personal', 'private', 'secret']
-        for term in privacy_terms:
-            if term in response:
+        for term in self.PRIVACY_TERMS:
+            if term in keywords:
                 score *= 0.8
         
         return max(0.1, score)
     
-    def _evaluate_learning(self, response_data):
+    def _evaluate_learning(self, response_data, scan):
         """Evaluate learning adherence"""
         score = 1.0
         
@@ -145,22 +275,23 @@ class ConstitutionalLearning:
         if 'previous_responses' in response_data:
             consistency = self._check_consistency(
                 response_data['response'],
-                response_data['previous_responses']
+                response_data['previous_responses'],
+                scan['words']
             )
             score *= consistency
         
         return max(0.1, score)
     
-    def _evaluate_interaction(self, response_data):
+    def _evaluate_interaction(self, response_data, scan):
         """Evaluate interaction quality"""
         score = 1.0
-        response = response_data.get('response', '').lower()
         
         # Check helpfulness
         if 'user_request' in response_data and response_data.get('response', ''):
             relevance = self._calculate_relevance(
                 response_data['user_request'],
-                response_data['response']
+                response_data['response'],
+                scan['words']
             )
             score *= relevance
         
@@ -168,77 +299,50 @@ class ConstitutionalLearning:
         if 'user_emotion' in response_data:
             empathy = self._calculate_empathy(
                 response_data['response'],
-                response_data['user_emotion']
+                response_data['user_emotion'],
+                scan['keywords']
             )
             score *= empathy
         
         return max(0.1, score)
     
-    def _identify_violations(self, response_data, principle):
+    def _identify_violations(self, response_data, principle, scan=None):
         """Identify specific principle violations"""
-        violations = []
-        rules = self.principles.principles[principle]['rules']
-        
-        for rule in rules:
-            if not self._check_rule_compliance(response_data, rule):
-                violations.append(rule)
-        
-        return violations
+        keywords = scan['keywords'] if scan is not None else None
+        violations = self.principles.rule_engine.evaluate(response_data, keywords)
+        return list(violations.get(principle, []))
     
-    def _check_rule_compliance(self, response_data, rule):
-        """Check compliance with a specific rule"""
-        response = response_data.get('response', '').lower()
-        
-        if "Do not cause harm" in rule:
-            harmful_words = ['harm', 'hurt', 'damage']
-            return not any(word in response for word in harmful_words)
-        
-        elif "Be truthful" in rule:
-            uncertainty_markers = ['maybe', 'perhaps', 'might']
-            confidence = response_data.get('confidence', 1.0)
-            return confidence > 0.7 or any(marker in response for marker in uncertainty_markers)
-        
-        elif "Show empathy" in rule:
-            empathy_markers = ['understand', 'feel', 'appreciate']
-            return any(marker in response for marker in empathy_markers)
-        
-        return True
-    
-    def _calculate_relevance(self, request, response):
+    def _calculate_relevance(self, request, response, response_words=None):
         """Calculate response relevance to request"""
         # Simple keyword matching for demonstration
         request_words = set(request.lower().split())
-        response_words = set(response.lower().split())
+        if response_words is None:
+            response_words = set(response.lower().split())
         overlap = len(request_words.intersection(response_words))
         return min(1.0, overlap / max(1, len(request_words)))
     
-    def _calculate_empathy(self, response, user_emotion):
+    def _calculate_empathy(self, response, user_emotion, keywords=None):
         """Calculate empathetic response level"""
-        response = response.lower()
         emotion = user_emotion.lower()
+        if keywords is None:
+            keywords = self.scanner.scan(response.lower())
         
-        empathy_markers = {
-            'happy': ['glad', 'wonderful', 'great'],
-            'sad': ['sorry', 'understand', 'support'],
-            'angry': ['understand', 'calm', 'reasonable'],
-            'worried': ['reassure', 'help', 'support']
-        }
-        
-        if emotion in empathy_markers:
-            markers = empathy_markers[emotion]
-            marker_count = sum(1 for marker in markers if marker in response)
+        if emotion in self.EMPATHY_MARKERS:
+            markers = self.EMPATHY_MARKERS[emotion]
+            marker_count = sum(1 for marker in markers if marker in keywords)
             return min(1.0, marker_count / len(markers))
         
         return 0.8  # Default good faith score
     
-    def _check_consistency(self, current_response, previous_responses):
+    def _check_consistency(self, current_response, previous_responses, current_words=None):
         """Check response consistency with previous responses"""
         if not previous_responses:
             return 1.0
             
         # Simple similarity check
         similarity_scores = []
-        current_words = set(current_response.lower().split())
+        if current_words is None:
+            current_words = set(current_response.lower().split())
         
         for prev_response in previous_responses[-3:]:  # Check last 3 responses
             prev_words = set(prev_response.lower().split())
@@ -268,41 +372,34 @@ class ConstitutionalLearning:
                 )
                 adaptation['changes'].extend(changes)
         
-        self.adaptation_history.append(adaptation)
+        self._record_adaptation(adaptation)
         return adapted_response
     
+    def _record_adaptation(self, adaptation):
+        """Add an adaptation to the recent window, running counters and optional log"""
+        self.adaptation_history.append(adaptation)
+        self._recent_words.append(set(adaptation['original'].split()))
+        self.total_adaptations += 1
+        self.total_changes += len(adaptation['changes'])
+        
+        if self.adaptation_log:
+            with open(self.adaptation_log, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(adaptation) + '\n')
+    
     def _apply_principle_adaptations(self, response_data, principle, violations):
         """Apply adaptations based on principle violations"""
         changes = []
         response = response_data.get('response', '')
         
-        if principle == 'safety':
-            for violation in violations:
-                if "Do not cause harm" in violation:
-                    safe_response = self._make_response_safer(response)
-                    response_data['response'] = safe_response
-                    changes.append(f"Made response safer: {safe_response}")
-        
-        elif principle == 'ethics':
-            for violation in violations:
-                if "Be truthful" in violation:
-                    ethical_response = self._add_uncertainty_markers(response)
-                    response_data['response'] = ethical_response
-                    changes.append(f"Added uncertainty markers: {ethical_response}")
-        
-        elif principle == 'learning':
-            for violation in violations:
-                if "Maintain consistency" in violation:
-                    consistent_response = self._align_with_history(response)
-                    response_data['response'] = consistent_response
-                    changes.append(f"Aligned with history: {consistent_response}")
-        
-        elif principle == 'interaction':
-            for violation in violations:
-                if "Show empathy" in violation:
-                    empathetic_response = self._add_empathy(response)
-                    response_data['response'] = empathetic_response
-                    changes.append(f"Added empathy: {empathetic_response}")
+        for violation in violations:
+            adaptation = self.principles.rule_engine.adaptation(principle, violation)
+            if adaptation not in self.ADAPTATIONS:
+                continue
+            
+            method, description = self.ADAPTATIONS[adaptation]
+            adapted_response = getattr(self, method)(response)
+            response_data['response'] = adapted_response
+            changes.append(f"{description}: {adapted_response}")
         
         return changes
     
@@ -328,9 +425,8 @@ class ConstitutionalLearning:
     
     def _align_with_history(self, response):
         """Align response with interaction history"""
-        if len(self.adaptation_history) > 0:
-            recent_responses = [a['original'] for a in self.adaptation_history[-3:]]
-            common_words = set.intersection(*[set(r.split()) for r in recent_responses])
+        if self._recent_words:
+            common_words = set.intersection(*self._recent_words)
             
             if common_words:
                 # Try to incorporate common themes
@@ -349,24 +445,53 @@ class ConstitutionalLearning:
         return {
             principle: {
                 'count': count,
-                'percentage': count / max(1, len(self.adaptation_history)) * 100
+                'percentage': count / max(1, self.total_adaptations) * 100,
+                'rate': self.violation_rates.get(principle, 0.0)
             }
             for principle, count in self.principles.violations.items()
         }
     
     def get_adaptation_stats(self):
         """Get statistics about response adaptations"""
-        if not self.adaptation_history:
+        if not self.total_adaptations:
             return None
             
-        total_adaptations = len(self.adaptation_history)
-        changes_made = sum(len(a['changes']) for a in self.adaptation_history)
+        total_adaptations = self.total_adaptations
+        changes_made = self.total_changes
         
         return {
             'total_responses': total_adaptations,
             'total_changes': changes_made,
             'average_changes': changes_made / total_adaptations,
             'recent_adaptations': [
-                len(a['changes']) for a in self.adaptation_history[-5:]
+                len(a['changes']) for a in list(self.adaptation_history)[-5:]
             ]
         }
+
+_audit_worker = None
+
+def _init_audit_worker(config):
+    """Build one ConstitutionalLearning per audit process, configured like the caller's"""
+    global _audit_worker
+    _audit_worker = ConstitutionalLearning(**config)
+
+def _audit_chunk(responses, learner=None):
+    """Evaluate and adapt one chunk of responses with fresh counters"""
+    learner = learner or _audit_worker
+    learner.principles.violations = {principle: 0 for principle in learner.principles.principles}
+    learner.adaptation_log = None  # Records are logged by the caller, in order
+    learner._reset_statistics()
+    
+    results = []
+    records = []
+    for response_data in responses:
+        score, evaluations = learner.evaluate_response(response_data)
+        adapted = learner.adapt_response(response_data, evaluations)
+        records.append(learner.adaptation_history[-1])
+        results.append({
+            'score': score,
+            'evaluations': evaluations,
+            'response': adapted.get('response', '')
+        })
+    
+    return results, learner.principles.violations, records
@@ -0,0 +1,105 @@
+"""
+Data-parallel CPU training over torch.distributed (gloo backend).
+Every worker process holds a full brain replica and trains on its own shard
+of the long-term memory store; gradients are averaged with all-reduce after
+each backward pass so the replicas stay identical.
+"""
+import os
+import logging
+from typing import List, Optional
+
+import torch
+import torch.distributed as dist
+import torch.nn as nn
+
+DEFAULT_MASTER_ADDR = "127.0.0.1"
+DEFAULT_MASTER_PORT = 29500
+
+
+class GradientAllReduce:
+    """Averages gradients across all workers; plugged into LearningEngine as gradient_sync"""
+    def __init__(self, module: nn.Module) -> None:
+        self.module = module
+        self.world_size = dist.get_world_size()
+
+    def __call__(self) -> None:
+        # Launch every reduction before waiting so gloo can overlap them
+        grads = [p.grad for p in self.module.parameters() if p.grad is not None]
+        handles = [dist.all_reduce(grad, async_op=True) for grad in grads]
+        for handle in handles:
+            handle.wait()
+        for grad in grads:
+            grad.div_(self.world_size)
+
+
+def all_workers_ready(ready: bool) -> bool:
+    """Collective: True only if every worker reports it has a batch ready"""
+    flag = torch.tensor([1 if ready else 0], dtype=torch.int32)
+    dist.all_reduce(flag, op=dist.ReduceOp.MIN)
+    return bool(flag.item())
+
+
+def gather_positions(last_id: Optional[int]) -> List[Optional[int]]:
+    """Collective: every worker's stream position, indexed by rank"""
+    positions: List[Optional[int]] = [None] * dist.get_world_size()
+    dist.all_gather_object(positions, last_id)
+    return positions
+
+
+def broadcast_parameters(module: nn.Module, src: int = 0) -> None:
+    """Copy parameters and buffers from the source rank to all workers"""
+    for tensor in module.state_dict().values():
+        dist.broadcast(tensor, src)
+
+
+def init_worker(rank: int, world_size: int, master_port: int = DEFAULT_MASTER_PORT) -> None:
+    """Join the gloo process group and split the machine's cores between workers"""
+    os.environ.setdefault("MASTER_ADDR", DEFAULT_MASTER_ADDR)
+    os.environ["MASTER_PORT"] = str(master_port)
+    dist.init_process_group("gloo", rank=rank, world_size=world_size)
+    torch.set_num_threads(threads_per_worker(world_size))
+
+
+def threads_per_worker(world_size: int) -> int:
+    """Intra-op threads for each worker so the processes don't oversubscribe cores"""
+    return max(1, (os.cpu_count() or 1) // world_size)
+
+
+def run_training_worker(
+    rank: int,
+    world_size: int,
+    epochs: int,
+    resume: bool,
+    master_port: int = DEFAULT_MASTER_PORT,
+    checkpoint_path: Optional[str] = None
+) -> None:
+    """Entry point for one data-parallel offline training process"""
+    # Imported here so spawned workers only load the model once group setup succeeded
+    from core.brain_layers import BabyBrain
+    from core.memory_system import MemorySystem
+    from training.rlhf_trainer import OfflineRLHFTrainer
+
+    logging.basicConfig(
+        level=logging.INFO if rank == 0 else logging.WARNING,
+        format=f'%(asctime)s - rank {rank} - %(levelname)s - %(message)s'
+    )
+    init_worker(rank, world_size, master_port)
+    try:
+        brain = BabyBrain()
+        trainer = OfflineRLHFTrainer(
+            brain,
+            MemorySystem(),
+            checkpoint_path=checkpoint_path,
+            num_threads=threads_per_worker(world_size),
+            shard=(rank, world_size),
+            gradient_sync=GradientAllReduce(brain),
+            step_barrier=all_workers_ready,
+            position_gather=gather_positions
+        )
+        if resume:
+            trainer.load_checkpoint()
+        # Start every replica from rank 0's weights
+        broadcast_parameters(brain)
+        trainer.train(epochs=epochs, resume=False)
+    finally:
+        dist.destroy_process_group()
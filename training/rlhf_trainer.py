@@ -0,0 +1,306 @@
+import os
+import argparse
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import torch
+from core.brain_layers import BabyBrain
+from core.memory_system import MemorySystem
+from core.learning_engine import LearningEngine
+from training.constitutional_learning import ConstitutionalLearning
+from config.settings import (
+    BATCH_SIZE,
+    NUM_EPOCHS,
+    MODEL_CHECKPOINT_DIR,
+    OFFLINE_CHUNK_SIZE,
+    OFFLINE_PREFETCH_WORKERS,
+    OFFLINE_PREFETCH_DEPTH,
+    OFFLINE_CHECKPOINT_INTERVAL
+)
+
+EMOTION_NAMES = ('valence', 'arousal', 'dominance')
+
+
+class OfflineRLHFTrainer:
+    """
+    Retrains the brain offline on interactions accumulated in long-term memory.
+    Experience and feedback rows are streamed from SQLite in id-ordered chunks
+    by prefetching worker threads, scored with the reward system and the
+    constitution, and replayed through the learning engine in batches.
+    """
+    memory_types = ('experience', 'feedback')
+
+    def __init__(
+        self,
+        brain: BabyBrain,
+        memory: MemorySystem,
+        constitution: Optional[ConstitutionalLearning] = None,
+        checkpoint_path: Optional[Path] = None,
+        batch_size: int = BATCH_SIZE,
+        chunk_size: int = OFFLINE_CHUNK_SIZE,
+        num_workers: int = OFFLINE_PREFETCH_WORKERS,
+        prefetch_depth: int = OFFLINE_PREFETCH_DEPTH,
+        checkpoint_interval: int = OFFLINE_CHECKPOINT_INTERVAL,
+        num_threads: Optional[int] = None,
+        shard: Optional[Tuple[int, int]] = None,
+        gradient_sync: Optional[Callable[[], None]] = None,
+        step_barrier: Optional[Callable[[bool], bool]] = None,
+        position_gather: Optional[Callable[[Optional[int]], List[Optional[int]]]] = None
+    ) -> None:
+        self.brain = brain
+        self.memory = memory
+        self.engine = LearningEngine(brain, memory, gradient_sync=gradient_sync)
+        self.constitution = constitution or ConstitutionalLearning()
+        # Reuse the constitution's reward system so the tokenizer is loaded once
+        self.reward_system = self.constitution.principles.reward_system
+        self.checkpoint_path = Path(checkpoint_path or Path(MODEL_CHECKPOINT_DIR) / "rlhf_trainer.pth")
+        self.batch_size = batch_size
+        self.chunk_size = chunk_size
+        self.num_workers = num_workers
+        self.prefetch_depth = max(1, prefetch_depth)
+        self.checkpoint_interval = checkpoint_interval
+
+        # Data-parallel settings: this worker's (rank, world_size) slice of the
+        # store, a collective telling whether every worker has a batch ready,
+        # and one collecting every worker's stream position for checkpoints
+        self.shard = shard
+        self.rank = shard[0] if shard else 0
+        self.world_size = shard[1] if shard else 1
+        self.step_barrier = step_barrier
+        self.position_gather = position_gather
+
+        # Training progress (restored by load_checkpoint)
+        self.epoch = 0
+        self.last_id: Optional[int] = None
+
+        torch.set_num_threads(num_threads or os.cpu_count() or 1)
+
+    def stream_samples(self, after_id: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Yield decoded training samples in id order, prefetching chunks in worker threads"""
+        bounds = self.memory.get_id_bounds(self.memory_types)
+        if bounds is None:
+            return
+
+        start = bounds[0] if after_id is None else max(bounds[0], after_id + 1)
+        chunk_starts = iter(range(start, bounds[1] + 1, self.chunk_size))
+
+        with ThreadPoolExecutor(max_workers=self.num_workers) as executor:
+            pending = deque()
+
+            def submit_next() -> None:
+                chunk_start = next(chunk_starts, None)
+                if chunk_start is not None:
+                    pending.append(executor.submit(self._load_chunk, chunk_start))
+
+            for _ in range(self.prefetch_depth):
+                submit_next()
+
+            # Futures are consumed in submission order so samples stay id-ordered
+            while pending:
+                samples = pending.popleft().result()
+                submit_next()
+                yield from samples
+
+    def _load_chunk(self, chunk_start: int) -> List[Dict[str, Any]]:
+        """Fetch one id range from long-term memory and decode it into samples"""
+        rows = self.memory.recall_range(
+            self.memory_types,
+            chunk_start,
+            chunk_start + self.chunk_size,
+            shard=self.shard
+        )
+        samples = []
+        for row in rows:
+            sample = self._decode_row(row)
+            if sample is not None:
+                samples.append(sample)
+        return samples
+
+    def _decode_row(self, row: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Turn a stored experience/feedback row into a training sample"""
+        content = row['content']
+        text = content.get('input')
+        if not isinstance(text, str) or not text:
+            return None
+
+        if row['type'] == 'feedback':
+            base_reward = float(content.get('feedback_score', 0.0))
+        else:
+            base_reward = float(content.get('reward', 0.0))
+
+        # Stored emotions are raw VAD logits; softmax them into a distribution
+        emotional_state = None
+        emotions = content.get('output', {}).get('emotions')
+        if emotions:
+            values = np.asarray(emotions, dtype=np.float64).reshape(-1)[:len(EMOTION_NAMES)]
+            values = np.exp(values - values.max())
+            values /= values.sum()
+            emotional_state = dict(zip(EMOTION_NAMES, values.tolist()))
+
+        return {
+            'id': row['id'],
+            'text': text,
+            'base_reward': base_reward,
+            'emotional_state': emotional_state
+        }
+
+    def score_sample(self, sample: Dict[str, Any]) -> float:
+        """Score a sample with the reward system and constitutional principles"""
+        return self.score_batch([sample])[0]
+
+    def score_batch(self, samples: List[Dict[str, Any]]) -> List[float]:
+        """
+        Score samples, running the reward system over the whole batch at once
+        Replay only reads the reward system and constitution: their weights,
+        memory and violation counters are left as they are, so a sample's score
+        does not depend on replay order or chunking and nothing leaks into
+        online state.
+        """
+        interactions = []
+        for sample in samples:
+            interaction = {'response': sample['text']}
+            if sample['emotional_state']:
+                interaction['emotional_state'] = sample['emotional_state']
+            interactions.append(interaction)
+
+        rlhf_rewards = self.reward_system.calculate_rewards(interactions, record=False)
+
+        scores = []
+        for sample, interaction, (rlhf_reward, _) in zip(samples, interactions, rlhf_rewards):
+            constitutional_score, _ = self.constitution.evaluate_response(interaction, record=False)
+            scores.append(
+                0.5 * sample['base_reward'] +
+                0.3 * rlhf_reward +
+                0.2 * constitutional_score
+            )
+        return scores
+
+    def train_epoch(self) -> Optional[float]:
+        """Run one pass over the memory store, resuming after last_id if set"""
+        batch = []
+        losses = []
+
+        for sample in self.stream_samples(after_id=self.last_id):
+            batch.append(sample)
+            self.last_id = sample['id']
+
+            if len(batch) >= self.batch_size:
+                # Workers must run the same number of all-reduced steps, so
+                # everyone stops as soon as one shard runs dry
+                if self.step_barrier is not None and not self.step_barrier(True):
+                    break
+                losses.append(self._train_batch(batch))
+                batch = []
+        else:
+            if self.step_barrier is not None:
+                # Tell the other workers this shard is exhausted; the partial
+                # batch is dropped since they may have none to pair it with
+                self.step_barrier(False)
+            elif batch:
+                losses.append(self._train_batch(batch))
+
+        return float(np.mean(losses)) if losses else None
+
+    def _train_batch(self, batch: List[Dict[str, Any]]) -> float:
+        """Score one batch and replay it through the learning engine"""
+        texts = [sample['text'] for sample in batch]
+        rewards = self.score_batch(batch)
+
+        self.brain.train()
+        loss = self.engine.update_brain(texts, rewards, store=False)
+
+        if self.engine.steps % self.checkpoint_interval == 0:
+            self.save_checkpoint()
+
+        return loss
+
+    def train(self, epochs: int = NUM_EPOCHS, resume: bool = True) -> List[Optional[float]]:
+        """Train for the given number of epochs, optionally resuming from the checkpoint"""
+        if resume:
+            self.load_checkpoint()
+
+        history = []
+        while self.epoch < epochs:
+            avg_loss = self.train_epoch()
+            history.append(avg_loss)
+            logging.info(f"Epoch {self.epoch + 1}/{epochs} finished, average loss: {avg_loss}")
+
+            self.epoch += 1
+            self.last_id = None
+            self.save_checkpoint()
+
+        return history
+
+    def save_checkpoint(self) -> None:
+        """Atomically write brain, optimizer and every worker's stream position to disk"""
+        # Shards hold different ids, so each worker's position is kept; the
+        # gather is collective and must run on every rank before rank 0 writes
+        if self.position_gather is not None:
+            last_ids = self.position_gather(self.last_id)
+        else:
+            last_ids = [self.last_id]
+
+        # Replicas are identical after each all-reduced step; only rank 0 writes
+        if self.rank != 0:
+            return
+
+        state = {
+            'brain': self.brain.state_dict(),
+            'optimizer': self.engine.optimizer.state_dict(),
+            'steps': self.engine.steps,
+            'epoch': self.epoch,
+            'last_ids': last_ids
+        }
+        self.checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.checkpoint_path.with_suffix('.tmp')
+        torch.save(state, tmp_path)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def load_checkpoint(self) -> bool:
+        """
+        Restore training progress from the checkpoint
+        Returns True if a checkpoint was loaded, False otherwise
+        """
+        if not self.checkpoint_path.exists():
+            return False
+
+        state = torch.load(self.checkpoint_path, map_location='cpu')
+        self.brain.load_state_dict(state['brain'])
+        self.engine.optimizer.load_state_dict(state['optimizer'])
+        self.engine.steps = state['steps']
+        self.epoch = state['epoch']
+        self.last_id = self._resume_position(state.get('last_ids', [state.get('last_id')]))
+        logging.info(f"Resuming offline training at epoch {self.epoch + 1}, after memory {self.last_id}")
+        return True
+
+    def _resume_position(self, last_ids: List[Optional[int]]) -> Optional[int]:
+        """This worker's stream position from the per-rank positions of a checkpoint"""
+        if len(last_ids) == self.world_size:
+            return last_ids[self.rank]
+        # Saved with a different number of workers, so the shards don't line
+        # up; restart from the earliest position so no row is skipped
+        if any(last_id is None for last_id in last_ids):
+            return None
+        return min(last_ids)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Offline RLHF retraining from long-term memory')
+    parser.add_argument('--epochs', type=int, default=NUM_EPOCHS, help='Number of epochs to run')
+    parser.add_argument('--fresh', action='store_true', help='Ignore an existing checkpoint')
+    parser.add_argument('--workers', type=int, default=OFFLINE_PREFETCH_WORKERS, help='Prefetch worker threads')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    brain = BabyBrain()
+    trainer = OfflineRLHFTrainer(brain, MemorySystem(), num_workers=args.workers)
+    trainer.train(epochs=args.epochs, resume=not args.fresh)
+
+
+if __name__ == "__main__":
+    main()
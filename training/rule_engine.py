@@ -0,0 +1,199 @@
+import json
+import operator
+from collections import OrderedDict
+from utils.keyword_scanner import KeywordScanner
+from config.settings import (
+    CONSTITUTION_RULES_PATH,
+    RULE_CACHE_SIZE,
+    RULE_MAX_VIOLATION_WEIGHT
+)
+
+COMPARISONS = {
+    'gt': operator.gt,
+    'ge': operator.ge,
+    'lt': operator.lt,
+    'le': operator.le,
+    'eq': operator.eq
+}
+
+class RuleEngine:
+    """
+    Evaluates declarative constitutional rules.
+    Each rule's check is a boolean expression over keywords found in the
+    response and fields of the response data:
+
+        {"keywords_any": [...]}, {"keywords_all": [...]},
+        {"field": "confidence", "gt": 0.7, "default": 1.0},
+        {"any": [...]}, {"all": [...]}, {"not": ...}, {"ref": "name"}, true/false
+
+    All checks are compiled into one plan of nodes in which identical
+    sub-expressions (including named ones under "expressions") are shared and
+    evaluated at most once per response. Rules without a check always comply
+    and are left out of the plan. A principle's rules are checked in order of
+    decreasing weight, stopping once `max_violation_weight` has been violated,
+    and results are memoized per (response, context) in an LRU cache.
+    """
+    def __init__(self, config, cache_size=RULE_CACHE_SIZE,
+                 max_violation_weight=RULE_MAX_VIOLATION_WEIGHT):
+        self.principles = {}  # Principle -> {'weight': ..., 'rules': [names]}
+        self.rules = {}  # (principle, rule name) -> {'weight', 'node', 'adaptation'}
+        self.keywords = set()
+        self.max_violation_weight = max_violation_weight
+
+        self._nodes = []  # Node id -> (op, args)
+        self._node_ids = {}  # (op, args) -> node id
+        self._fields = set()
+
+        expressions = config.get('expressions', {})
+        self._plan = {}
+        for principle, details in config['principles'].items():
+            names = []
+            for rule in details['rules']:
+                node = self._compile(rule.get('check', True), expressions)
+                self.rules[(principle, rule['name'])] = {
+                    'weight': rule.get('weight', 1.0),
+                    'node': node,
+                    'adaptation': rule.get('adaptation')
+                }
+                names.append(rule['name'])
+
+            self.principles[principle] = {'weight': details['weight'], 'rules': names}
+            checked = [name for name in names if self._nodes[self.rules[(principle, name)]['node']] != ('const', True)]
+            self._plan[principle] = sorted(
+                checked, key=lambda name: -self.rules[(principle, name)]['weight']
+            )
+
+        self._fields = sorted(self._fields)
+        self.scanner = KeywordScanner(self.keywords)
+
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    @classmethod
+    def from_file(cls, path=CONSTITUTION_RULES_PATH, **kwargs):
+        """Load rules from a JSON file"""
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f), **kwargs)
+
+    def adaptation(self, principle, rule):
+        """Name of the adaptation applied when a rule is violated, if any"""
+        details = self.rules.get((principle, rule))
+        return details['adaptation'] if details else None
+
+    def evaluate(self, response_data, keywords=None):
+        """
+        Violated rules of every principle, in declaration order
+        `keywords` may carry the response's keyword hits if already scanned.
+        The result is a fresh dict the caller may modify.
+        """
+        response = response_data.get('response', '')
+        context = tuple(response_data.get(field) for field in self._fields)
+        # Keyed on the text itself so hash collisions can't return another response's result
+        key = (response, repr(context))
+
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            self.cache_hits += 1
+            return {principle: list(names) for principle, names in cached.items()}
+        self.cache_misses += 1
+
+        if keywords is None:
+            keywords = self.scanner.scan(response.lower())
+
+        memo = {}
+        result = {}
+        for principle, details in self.principles.items():
+            violated = set()
+            violated_weight = 0.0
+            for name in self._plan[principle]:
+                if self.max_violation_weight is not None and violated_weight >= self.max_violation_weight:
+                    break
+                rule = self.rules[(principle, name)]
+                if not self._evaluate(rule['node'], response_data, keywords, memo):
+                    violated.add(name)
+                    violated_weight += rule['weight']
+            result[principle] = [name for name in details['rules'] if name in violated]
+
+        # Cached as tuples so no caller can change what later lookups return
+        self._cache[key] = {principle: tuple(names) for principle, names in result.items()}
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return result
+
+    def _evaluate(self, node, response_data, keywords, memo):
+        if node in memo:
+            return memo[node]
+
+        op, args = self._nodes[node]
+        if op == 'keyword':
+            value = args in keywords
+        elif op == 'field':
+            field, comparison, target, default = args
+            actual = response_data.get(field, default)
+            value = actual is not None and COMPARISONS[comparison](actual, target)
+        elif op == 'not':
+            value = not self._evaluate(args, response_data, keywords, memo)
+        elif op == 'any':
+            value = any(self._evaluate(child, response_data, keywords, memo) for child in args)
+        elif op == 'all':
+            value = all(self._evaluate(child, response_data, keywords, memo) for child in args)
+        else:
+            value = args
+
+        memo[node] = value
+        return value
+
+    def _compile(self, expression, expressions, resolving=()):
+        """Compile an expression into a node id, reusing identical nodes"""
+        if isinstance(expression, bool):
+            return self._intern('const', expression)
+
+        if 'ref' in expression:
+            name = expression['ref']
+            if name in resolving:
+                raise ValueError(f"Circular rule expression: {name}")
+            return self._compile(expressions[name], expressions, resolving + (name,))
+
+        if 'keywords_any' in expression or 'keywords_all' in expression:
+            op = 'any' if 'keywords_any' in expression else 'all'
+            words = sorted({word.lower() for word in expression[f'keywords_{op}']})
+            self.keywords.update(words)
+            return self._combine(op, [self._intern('keyword', word) for word in words])
+
+        if 'any' in expression or 'all' in expression:
+            op = 'any' if 'any' in expression else 'all'
+            children = [self._compile(child, expressions, resolving) for child in expression[op]]
+            return self._combine(op, children)
+
+        if 'not' in expression:
+            return self._intern('not', self._compile(expression['not'], expressions, resolving))
+
+        if 'field' in expression:
+            comparison = next((c for c in COMPARISONS if c in expression), None)
+            if comparison is None:
+                raise ValueError(f"Field rule needs one of {list(COMPARISONS)}: {expression}")
+            self._fields.add(expression['field'])
+            return self._intern('field', (
+                expression['field'], comparison, expression[comparison], expression.get('default')
+            ))
+
+        raise ValueError(f"Unknown rule expression: {expression}")
+
+    def _combine(self, op, children):
+        # Cheap leaf checks go first so any/all short-circuit before compound ones
+        children = sorted(set(children), key=lambda child: (self._nodes[child][0] in ('any', 'all', 'not'), child))
+        if len(children) == 1:
+            return children[0]
+        return self._intern(op, tuple(children))
+
+    def _intern(self, op, args):
+        key = (op, args)
+        node = self._node_ids.get(key)
+        if node is None:
+            node = len(self._nodes)
+            self._nodes.append(key)
+            self._node_ids[key] = node
+        return node
@@ -0,0 +1,38 @@
+import re
+
+class KeywordScanner:
+    """
+    Finds every keyword occurring anywhere in a text in a single pass.
+    All keywords are compiled into one regular expression tried at each
+    position (a zero-width lookahead, so overlapping hits are all seen).
+    Alternatives are ordered longest first, and the keywords that are
+    prefixes of a hit are added with it, so results match `keyword in text`.
+    """
+    def __init__(self, keywords):
+        self.keywords = frozenset(keywords)
+        ordered = sorted(self.keywords, key=lambda keyword: (-len(keyword), keyword))
+
+        # A match at some position implies every shorter keyword it starts with
+        self._closure = {
+            keyword: frozenset(k for k in self.keywords if keyword.startswith(k))
+            for keyword in self.keywords
+        }
+
+        if ordered:
+            alternation = '|'.join(re.escape(keyword) for keyword in ordered)
+            self._pattern = re.compile(f'(?=({alternation}))')
+        else:
+            self._pattern = None
+
+    def __contains__(self, keyword):
+        return keyword in self.keywords
+
+    def scan(self, text):
+        """Set of keywords contained in the text"""
+        hits = set()
+        if self._pattern is None:
+            return hits
+
+        for match in set(self._pattern.findall(text)):
+            hits |= self._closure[match]
+        return hits
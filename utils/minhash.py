@@ -0,0 +1,103 @@
+import numpy as np
+from config.settings import LSH_CAPACITY, LSH_NUM_PERM, LSH_BANDS
+
+class MinHashLSH:
+    """
+    Near-duplicate index over token shingles.
+    Each sequence is summarized by a MinHash signature whose agreement with
+    another signature estimates the Jaccard similarity of their shingle sets.
+    Signatures are bucketed per band (locality-sensitive hashing), so a query
+    only compares against the few sequences sharing a band with it. The index
+    holds at most `capacity` signatures; the oldest are evicted first. The
+    signature array starts small and doubles as signatures are added.
+    """
+    PRIME = (1 << 31) - 1  # Mersenne prime; a * h stays below 2**62 in uint64
+
+    def __init__(self, capacity=LSH_CAPACITY, num_perm=LSH_NUM_PERM, bands=LSH_BANDS,
+                 shingle_size=3, bucket_size=8, seed=0, initial_capacity=1024):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+
+        self.capacity = capacity
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.bucket_size = bucket_size
+
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, self.PRIME, (num_perm, 1), dtype=np.uint64)
+        self._b = rng.integers(0, self.PRIME, (num_perm, 1), dtype=np.uint64)
+        self._shingle_base = np.uint64(rng.integers(2, self.PRIME))
+
+        self.signatures = np.zeros((min(capacity, initial_capacity), num_perm), dtype=np.uint32)
+        self._count = 0  # Total signatures ever added
+        self._buckets = [{} for _ in range(bands)]  # Band key -> recent slots
+
+    def __len__(self):
+        return min(self._count, self.capacity)
+
+    def signature(self, token_ids):
+        """MinHash signature of a sequence's token shingles"""
+        ids = np.asarray(token_ids, dtype=np.uint64) % np.uint64(self.PRIME)
+        k = min(self.shingle_size, len(ids))
+        if k == 0:
+            return np.full(len(self._a), self.PRIME, dtype=np.uint32)
+
+        # Polynomial hash of every k-token window, reduced mod PRIME at each step
+        shingles = np.zeros(len(ids) - k + 1, dtype=np.uint64)
+        for offset in range(k):
+            shingles = (shingles * self._shingle_base + ids[offset:len(ids) - k + 1 + offset]) % np.uint64(self.PRIME)
+
+        hashed = (self._a * shingles + self._b) % np.uint64(self.PRIME)
+        return hashed.min(axis=1).astype(np.uint32)
+
+    def query(self, signature):
+        """Highest estimated Jaccard similarity with any indexed sequence"""
+        candidates = set()
+        for band, key in enumerate(self._band_keys(signature)):
+            candidates.update(self._buckets[band].get(key, ()))
+        if not candidates:
+            return 0.0
+
+        matches = self.signatures[list(candidates)] == signature
+        return float(matches.mean(axis=1).max())
+
+    def add(self, signature):
+        """Index a signature, evicting the oldest one when full"""
+        slot = self._count % self.capacity
+        if self._count >= self.capacity:
+            self._remove(slot)
+        elif slot == len(self.signatures):
+            self._reserve(slot + 1)
+
+        self.signatures[slot] = signature
+        for band, key in enumerate(self._band_keys(signature)):
+            bucket = self._buckets[band].setdefault(key, [])
+            bucket.append(slot)
+            if len(bucket) > self.bucket_size:
+                bucket.pop(0)
+        self._count += 1
+
+    def _reserve(self, rows):
+        """Grow the signature array geometrically, up to capacity"""
+        size = len(self.signatures)
+        while size < rows:
+            size *= 2
+        signatures = np.zeros((min(size, self.capacity), self.signatures.shape[1]), dtype=np.uint32)
+        signatures[:len(self.signatures)] = self.signatures
+        self.signatures = signatures
+
+    def _remove(self, slot):
+        """Drop an evicted slot from its buckets so bucket memory stays bounded"""
+        for band, key in enumerate(self._band_keys(self.signatures[slot])):
+            bucket = self._buckets[band].get(key)
+            if bucket and slot in bucket:
+                bucket.remove(slot)
+                if not bucket:
+                    del self._buckets[band][key]
+
+    def _band_keys(self, signature):
+        return [
+            signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            for band in range(self.bands)
+        ]
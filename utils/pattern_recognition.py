@@ -1,32 +1,110 @@
 import numpy as np
 import torch
 import torch.nn as nn
+from collections import deque
 from transformers import AutoTokenizer
+from config.settings import NOVELTY_WINDOW, LSH_DUPLICATE_JACCARD, APPROXIMATE_PATTERN_COUNTS, PATTERN_TOP_K
+from utils.minhash import MinHashLSH
+from utils.sketches import CountMinSketch, SpaceSaving
 
 class PatternMatcher:
-    def __init__(self):
-        self.patterns = {}
+    def __init__(self, initial_capacity=64, initial_width=16):
+        self.patterns = {}  # Pattern name -> row in the pattern bank
         self.tokenizer = AutoTokenizer.from_pretrained("gpt2")
+        
+        # Pattern bank: token IDs of every pattern as zero-padded rows, so an
+        # input is scored against all patterns with one matrix-vector product.
+        # Zero padding leaves dot products and norms unchanged, which keeps the
+        # scores identical to pairwise cosine similarity of padded sequences.
+        self._names = []
+        self._bank = torch.zeros((initial_capacity, initial_width))
+        self._norms = torch.zeros(initial_capacity)
     
     def add_pattern(self, name, pattern_sequence):
         """Add a new pattern to recognize"""
-        self.patterns[name] = self._encode_pattern(pattern_sequence)
+        ids = self.encode_ids(pattern_sequence)
+        
+        if name in self.patterns:
+            row = self.patterns[name]
+        else:
+            row = len(self._names)
+            self._reserve(row + 1, len(ids))
+            self._names.append(name)
+            self.patterns[name] = row
+        
+        self._bank[row].zero_()
+        self._bank[row, :len(ids)] = ids.float()
+        self._norms[row] = torch.linalg.vector_norm(self._bank[row])
+    
+    def remove_pattern(self, name):
+        """Forget a pattern, moving the last bank row into its place"""
+        row = self.patterns.pop(name)
+        last = len(self._names) - 1
+        if row != last:
+            moved = self._names[last]
+            self._bank[row] = self._bank[last]
+            self._norms[row] = self._norms[last]
+            self._names[row] = moved
+            self.patterns[moved] = row
+        self._bank[last].zero_()
+        self._norms[last] = 0
+        self._names.pop()
+    
+    def _reserve(self, rows, width):
+        """Grow the pattern bank geometrically so appends are amortized O(1)"""
+        capacity, current_width = self._bank.shape
+        if rows <= capacity and width <= current_width:
+            return
+        
+        while capacity < rows:
+            capacity *= 2
+        while current_width < width:
+            current_width *= 2
+        
+        bank = torch.zeros((capacity, current_width))
+        bank[:len(self._names), :self._bank.shape[1]] = self._bank[:len(self._names)]
+        norms = torch.zeros(capacity)
+        norms[:len(self._names)] = self._norms[:len(self._names)]
+        self._bank, self._norms = bank, norms
     
     def _encode_pattern(self, pattern):
         """Encode pattern into embedding space"""
         return self.tokenizer(pattern, return_tensors="pt")
+    
+    def encode_ids(self, sequence):
+        """Encode a sequence into a 1-D tensor of token IDs"""
+        return self._encode_pattern(sequence)['input_ids'][0]
+    
+    def encode_batch(self, sequences):
+        """Encode many sequences with one tokenizer call"""
+        if not sequences:
+            return []
+        encoded = self.tokenizer(list(sequences))['input_ids']
+        return [torch.tensor(ids, dtype=torch.long) for ids in encoded]
 
-    def match(self, input_sequence, threshold=0.7):
+    def match(self, input_sequence, threshold=0.7, top_k=None):
         """Match input against known patterns"""
-        input_encoded = self._encode_pattern(input_sequence)
-        matches = {}
+        return self.match_ids(self.encode_ids(input_sequence), threshold, top_k)
+    
+    def match_ids(self, input_ids, threshold=0.7, top_k=None):
+        """Match already tokenized input against every known pattern at once"""
+        scores = self.similarities(input_ids)
+        if scores.numel() == 0:
+            return {}
         
-        for name, pattern in self.patterns.items():
-            similarity = self._compute_similarity(input_encoded, pattern)
-            if similarity > threshold:
-                matches[name] = similarity
+        candidates = torch.nonzero(scores > threshold).squeeze(1)
+        if top_k is not None and len(candidates) > top_k:
+            best = torch.topk(scores[candidates], top_k).indices
+            candidates = candidates[best]
         
-        return matches
+        return {
+            self._names[i]: score
+            for i, score in zip(candidates.tolist(), scores[candidates].tolist())
+        }
+    
+    def similarities(self, input_ids):
+        """Cosine similarity of the input's token IDs with every pattern in the bank"""
+        return padded_cosine(self._bank, self._norms, len(self._names), input_ids)
 
     def _compute_similarity(self, seq1, seq2):
         """Compute similarity between two sequences"""
@@ -42,65 +120,182 @@ class PatternMatcher:
         similarity = torch.cosine_similarity(ids1.float(), ids2.float(), dim=0)
         return similarity.mean().item()
 
+def padded_cosine(bank, norms, size, input_ids):
+    """Cosine similarity of zero-padded token-ID rows bank[:size] with one input"""
+    if size == 0:
+        return torch.zeros(0)
+    
+    # Tokens beyond the widest row only meet zero padding
+    ids = input_ids[:bank.shape[1]].float()
+    dots = bank[:size, :len(ids)] @ ids
+    input_norm = torch.linalg.vector_norm(input_ids.float())
+    return dots / (norms[:size] * input_norm).clamp_min(1e-8)
+
+class EncodedRingBuffer:
+    """
+    Fixed-capacity ring buffer of token-ID sequences stored as zero-padded rows,
+    so a new sequence is compared with the whole window in one operation.
+    """
+    def __init__(self, capacity, initial_width=16):
+        self.capacity = capacity
+        self._rows = torch.zeros((capacity, initial_width))
+        self._norms = torch.zeros(capacity)
+        self._next = 0
+        self._size = 0
+    
+    def __len__(self):
+        return self._size
+    
+    def append(self, input_ids):
+        """Store a sequence, overwriting the oldest once the buffer is full"""
+        width = self._rows.shape[1]
+        if len(input_ids) > width:
+            while width < len(input_ids):
+                width *= 2
+            rows = torch.zeros((self.capacity, width))
+            rows[:, :self._rows.shape[1]] = self._rows
+            self._rows = rows
+        
+        row = self._next
+        self._rows[row].zero_()
+        self._rows[row, :len(input_ids)] = input_ids.float()
+        self._norms[row] = torch.linalg.vector_norm(self._rows[row])
+        
+        self._next = (row + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+    
+    def similarities(self, input_ids):
+        """Cosine similarity of a sequence with every stored sequence"""
+        # Filled rows are always the first _size rows, in no particular order
+        return padded_cosine(self._rows, self._norms, self._size, input_ids)
+
+class NGramIndex:
+    """
+    Rolling-hash index of the token n-grams held by a sliding window of sequences.
+    Each n-gram counts the window sequences containing it, so adding a sequence
+    reports which of its n-grams already appeared in time linear in its length.
+    """
+    MODULUS = (1 << 61) - 1
+    BASE = 1_000_003
+    
+    def __init__(self, window=10, min_length=3, max_length=10):
+        self.window = window
+        self.lengths = range(min_length, max_length)
+        self.counts = {}  # n-gram key -> number of window sequences holding it
+        self._window_keys = deque()  # Distinct keys of each sequence in the window
+        self._powers = [1]
+    
+    def add(self, token_ids):
+        """
+        Add a sequence of token IDs to the window
+        Returns (start, length) spans of its distinct n-grams seen in the window before
+        """
+        spans = self._ngram_spans(token_ids)
+        recurring = [span for key, span in spans.items() if key in self.counts]
+        
+        for key in spans:
+            self.counts[key] = self.counts.get(key, 0) + 1
+        self._window_keys.append(spans.keys())
+        
+        if len(self._window_keys) > self.window:
+            for key in self._window_keys.popleft():
+                remaining = self.counts[key] - 1
+                if remaining:
+                    self.counts[key] = remaining
+                else:
+                    del self.counts[key]
+        
+        return recurring
+    
+    def _ngram_spans(self, token_ids):
+        """Map the key of each distinct n-gram to its first (start, length) span"""
+        modulus, base = self.MODULUS, self.BASE
+        
+        # prefix[i] hashes token_ids[:i]; any n-gram hash is then O(1)
+        prefix = [0]
+        for token in token_ids:
+            prefix.append((prefix[-1] * base + token + 1) % modulus)
+        while len(self._powers) < self.lengths.stop:
+            self._powers.append(self._powers[-1] * base % modulus)
+        
+        spans = {}
+        for length in self.lengths:
+            power = self._powers[length]
+            for start in range(len(token_ids) - length + 1):
+                digest = (prefix[start + length] - prefix[start] * power) % modulus
+                spans.setdefault(digest * 64 + length, (start, length))
+        return spans
+
 class PatternRecognition:
-    def __init__(self):
+    def __init__(self, window=10, approximate=APPROXIMATE_PATTERN_COUNTS, top_k=PATTERN_TOP_K):
         self.matcher = PatternMatcher()
-        self.sequence_memory = []
-        self.pattern_frequencies = {}
+        self.sequence_memory = deque(maxlen=window)
+        self.ngram_index = NGramIndex(window=window)
+        self.approximate = approximate
+        self.patterns_learned = 0
+        
+        if approximate:
+            # Fixed memory: every pattern is counted in the sketch, only the
+            # top-k heavy hitters are kept by name and in the matcher
+            self.pattern_sketch = CountMinSketch()
+            self.heavy_hitters = SpaceSaving(top_k)
+            self.pattern_frequencies = self.heavy_hitters.counts
+            self._pattern_names = {}
+        else:
+            self.pattern_frequencies = {}
     
-    def observe(self, sequence):
+    def observe(self, sequence, input_ids=None):
         """Observe and learn from a new sequence"""
         self.sequence_memory.append(sequence)
+        if input_ids is None:
+            input_ids = self.matcher.encode_ids(sequence)
         
         # Look for recurring patterns
-        if len(self.sequence_memory) > 1:
-            new_patterns = self._find_recurring_patterns()
-            for pattern in new_patterns:
-                if pattern not in self.pattern_frequencies:
-                    self.pattern_frequencies[pattern] = 1
-                    self.matcher.add_pattern(f"learned_pattern_{len(self.pattern_frequencies)}", pattern)
-                else:
-                    self.pattern_frequencies[pattern] += 1
+        new_patterns = self._find_recurring_patterns(input_ids)
+        for pattern in new_patterns:
+            if self.approximate:
+                self._count_approximate(pattern)
+            elif pattern not in self.pattern_frequencies:
+                self.pattern_frequencies[pattern] = 1
+                self.patterns_learned += 1
+                self.matcher.add_pattern(f"learned_pattern_{self.patterns_learned}", pattern)
+            else:
+                self.pattern_frequencies[pattern] += 1
     
-    def _find_recurring_patterns(self, min_length=3, max_length=10):
-        """Find recurring patterns in the sequence memory"""
-        patterns = set()
+    def _count_approximate(self, pattern):
+        """Count a pattern in the sketch and keep the matcher in sync with the top-k"""
+        self.pattern_sketch.add(pattern)
+        if pattern in self.heavy_hitters:
+            self.heavy_hitters.increment(pattern)
+            return
         
-        # Convert sequences to token IDs for comparison
-        tokenized_sequences = [
-            self.matcher.tokenizer(seq, return_tensors="pt")['input_ids'].squeeze()
-            for seq in self.sequence_memory[-10:]  # Look at last 10 sequences
-        ]
+        evicted = self.heavy_hitters.increment(pattern)
+        if evicted is not None:
+            self.matcher.remove_pattern(self._pattern_names.pop(evicted))
         
-        for seq1_idx in range(len(tokenized_sequences)):
-            seq1 = tokenized_sequences[seq1_idx]
-            
-            for length in range(min_length, min(max_length, len(seq1) + 1)):
-                for start in range(len(seq1) - length + 1):
-                    pattern = seq1[start:start + length]
-                    
-                    # Look for this pattern in other sequences
-                    pattern_found = False
-                    for seq2_idx in range(seq1_idx + 1, len(tokenized_sequences)):
-                        seq2 = tokenized_sequences[seq2_idx]
-                        
-                        for start2 in range(len(seq2) - length + 1):
-                            if torch.all(seq2[start2:start2 + length] == pattern):
-                                pattern_found = True
-                                break
-                        
-                        if pattern_found:
-                            # Decode pattern back to text
-                            pattern_text = self.matcher.tokenizer.decode(pattern)
-                            patterns.add(pattern_text)
-                            break
-        
-        return patterns
+        self.patterns_learned += 1
+        name = f"learned_pattern_{self.patterns_learned}"
+        self._pattern_names[pattern] = name
+        self.matcher.add_pattern(name, pattern)
+    
+    def _find_recurring_patterns(self, input_ids):
+        """Find patterns of the new sequence that recur from earlier sequences in the window"""
+        token_ids = input_ids.tolist()
+        return {
+            self.matcher.tokenizer.decode(token_ids[start:start + length])
+            for start, length in self.ngram_index.add(token_ids)
+        }
     
     def recognize_patterns(self, sequence, threshold=0.7):
         """Recognize learned patterns in a sequence"""
         return self.matcher.match(sequence, threshold)
     
+    def estimate_frequency(self, pattern):
+        """Get how often a pattern has recurred (an upper bound in approximate mode)"""
+        if self.approximate:
+            return self.pattern_sketch.estimate(pattern)
+        return self.pattern_frequencies.get(pattern, 0)
+    
     def get_frequent_patterns(self, min_frequency=2):
         """Get patterns that occur frequently"""
         return {
@@ -110,53 +305,79 @@ class PatternRecognition:
         }
     
 class RewardCalculator:
-    def __init__(self):
+    def __init__(self, novelty_window=NOVELTY_WINDOW):
         self.pattern_recognition = PatternRecognition()
-        self.novelty_memory = []
+        # Token IDs of the most recent sequences, encoded once on arrival
+        self.novelty_memory = EncodedRingBuffer(novelty_window)
+        # Near-duplicate index over the full response history
+        self.history_index = MinHashLSH()
         self.curiosity_factor = 0.7
         self.consistency_factor = 0.3
     
-    def calculate_reward(self, sequence, context=None):
-        """Calculate reward based on novelty and pattern matching"""
+    def encode(self, sequence):
+        """Tokenize a sequence once so it can be shared by every scoring step"""
+        return self.pattern_recognition.matcher.encode_ids(sequence)
+    
+    def encode_batch(self, sequences):
+        """Tokenize many sequences at once"""
+        return self.pattern_recognition.matcher.encode_batch(sequences)
+    
+    def calculate_reward(self, sequence, context=None, input_ids=None, record=True):
+        """
+        Calculate reward based on novelty and pattern matching
+        With record=False the sequence is only scored against what has been
+        seen so far and is not remembered.
+        """
         reward = 0.0
+        if input_ids is None:
+            input_ids = self.encode(sequence)
         
         # Novelty reward
-        novelty_score = self._calculate_novelty(sequence)
+        signature = self.history_index.signature(input_ids.numpy())
+        novelty_score = self._calculate_novelty(input_ids, signature)
         reward += self.curiosity_factor * novelty_score
         
         # Pattern matching reward
         if context:
-            pattern_score = self._calculate_pattern_match(sequence, context)
+            pattern_score = self._calculate_pattern_match(sequence, context, input_ids)
             reward += self.consistency_factor * pattern_score
         
         # Update memory
-        self.pattern_recognition.observe(sequence)
-        self.novelty_memory.append(sequence)
-        if len(self.novelty_memory) > 100:  # Keep memory bounded
-            self.novelty_memory.pop(0)
+        if record:
+            self.pattern_recognition.observe(sequence, input_ids)
+            self.novelty_memory.append(input_ids)
+            self.history_index.add(signature)
         
         return reward
     
-    def _calculate_novelty(self, sequence):
-        """Calculate novelty of a sequence"""
-        if not self.novelty_memory:
+    def _calculate_novelty(self, input_ids, signature=None):
+        """
+        Calculate novelty of a tokenized sequence
+        Similarity is the cosine with the closest sequence in the recent window.
+        The history index estimates shingle Jaccard instead, which runs far
+        lower than token cosine for merely related text, so it only counts for
+        near-duplicates (estimate >= LSH_DUPLICATE_JACCARD), where both measures
+        approach 1; it then catches repeats that left the window.
+        """
+        if not len(self.novelty_memory):
             return 1.0  # Maximum novelty for first sequence
-            
-        # Compare with recent memories
-        similarities = []
-        for memory in self.novelty_memory[-10:]:  # Compare with last 10 memories
-            similarity = self.pattern_recognition.matcher._compute_similarity(
-                self.pattern_recognition.matcher._encode_pattern(sequence),
-                self.pattern_recognition.matcher._encode_pattern(memory)
-            )
-            similarities.append(similarity)
+        
+        # Similarity to the recent window, and to near-duplicates from any time before
+        recent_similarity = self.novelty_memory.similarities(input_ids).max().item()
+        if signature is None:
+            signature = self.history_index.signature(input_ids.numpy())
+        history_similarity = self.history_index.query(signature)
+        if history_similarity < LSH_DUPLICATE_JACCARD:
+            history_similarity = 0.0
         
         # Novelty is inverse of maximum similarity
-        return 1.0 - max(similarities)
+        return 1.0 - max(recent_similarity, history_similarity)
     
-    def _calculate_pattern_match(self, sequence, context):
+    def _calculate_pattern_match(self, sequence, context, input_ids=None):
         """Calculate how well sequence matches learned patterns in context"""
-        matches = self.pattern_recognition.recognize_patterns(sequence)
+        if input_ids is None:
+            input_ids = self.encode(sequence)
+        matches = self.pattern_recognition.matcher.match_ids(input_ids)
         if not matches:
             return 0.0
             
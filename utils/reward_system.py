@@ -1,11 +1,86 @@
+import json
 import torch
 import numpy as np
 from utils.pattern_recognition import RewardCalculator
+from config.settings import (
+    REWARD_HISTORY_CAPACITY,
+    REWARD_EWM_ALPHA,
+    REWARD_HISTORY_LOG
+)
+
+class RewardHistory:
+    """
+    Fixed-capacity ring buffer of reward totals and weighted components.
+    Column 0 holds the total, the rest one component each (0 when absent).
+    Sums over the tracked windows and exponentially weighted means/variances
+    are updated on every append, so statistics never rescan the history.
+    Rows overwritten in the ring can be appended to an on-disk JSONL log.
+    """
+    def __init__(self, components, capacity=REWARD_HISTORY_CAPACITY, windows=(10, 50),
+                 alpha=REWARD_EWM_ALPHA, log_path=REWARD_HISTORY_LOG):
+        self.components = list(components)
+        self.capacity = max(capacity, max(windows) + 1)  # The row leaving a window must still be in the ring
+        self.alpha = alpha
+        self.log_path = log_path
+        
+        columns = 1 + len(self.components)
+        self._values = np.zeros((self.capacity, columns))
+        self._count = 0
+        self._window_sums = {window: np.zeros(columns) for window in windows}
+        self.ewm_mean = np.zeros(columns)
+        self.ewm_var = np.zeros(columns)
+    
+    def __len__(self):
+        return self._count
+    
+    def append(self, total, components):
+        """Record one reward and update the running statistics"""
+        row = np.array([total] + [components.get(c, 0.0) for c in self.components], dtype=np.float64)
+        slot = self._count % self.capacity
+        
+        if self._count >= self.capacity and self.log_path:
+            self._spill(self._values[slot])
+        
+        if self._count == 0:
+            self.ewm_mean[:] = row
+        else:
+            delta = row - self.ewm_mean
+            self.ewm_mean += self.alpha * delta
+            self.ewm_var[:] = (1 - self.alpha) * (self.ewm_var + self.alpha * delta ** 2)
+
+        self._values[slot] = row
+        self._count += 1
+
+        for window, sums in self._window_sums.items():
+            if self._count % window == 0:
+                # Re-sum once per window so rounding drift never accumulates
+                sums[:] = self.recent(window).sum(axis=0)
+                continue
+            sums += row
+            if self._count > window:
+                sums -= self._values[(self._count - 1 - window) % self.capacity]
+    
+    def window_mean(self, window):
+        """Mean of each column over the last `window` rewards (or all, if fewer)"""
+        return self._window_sums[window] / max(1, min(window, self._count))
+    
+    def recent(self, n):
+        """The last n rows, oldest first"""
+        n = min(n, self._count)
+        slots = np.arange(self._count - n, self._count) % self.capacity
+        return self._values[slots]
+    
+    def component_dict(self, values):
+        """Map a per-column array to {'total': ..., component: ...}"""
+        return dict(zip(['total'] + self.components, values.tolist()))
+    
+    def _spill(self, row):
+        with open(self.log_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(self.component_dict(row)) + '\n')
 
 class RewardSystem:
     def __init__(self):
         self.reward_calculator = RewardCalculator()
-        self.reward_history = []
         self.learning_rate = 0.1
         
         # Reward weights for different aspects
@@ -16,6 +91,7 @@ class RewardSystem:
             'engagement': 0.15,
             'learning': 0.15
         }
+        self.reward_history = RewardHistory(self.weights.keys())
         
         # Thresholds for different reward levels
         self.thresholds = {
@@ -27,6 +103,43 @@ class RewardSystem:
     
     def calculate_reward(self, interaction_data):
         """Calculate overall reward for an interaction"""
+        # Tokenize the response once for every component that needs it
+        response_ids = None
+        if 'response' in interaction_data:
+            response_ids = self.reward_calculator.encode(interaction_data['response'])
+        
+        return self._apply_reward(interaction_data, response_ids)
+    
+    def calculate_rewards(self, batch, record=True):
+        """
+        Calculate rewards for a batch of interactions
+        Equivalent to calling calculate_reward on each interaction in order:
+        responses are tokenized in one call and the stateless components are
+        computed as arrays, while novelty, coherence, history and weight updates
+        (which depend on earlier interactions) are applied in sequence.
+        With record=False every interaction is scored against the current
+        weights and memory and nothing is updated, so the rewards don't depend
+        on which interactions were scored before.
+        """
+        batch = list(batch)
+        
+        response_ids = [None] * len(batch)
+        with_response = [i for i, data in enumerate(batch) if 'response' in data]
+        encoded = self.reward_calculator.encode_batch([batch[i]['response'] for i in with_response])
+        for i, ids in zip(with_response, encoded):
+            response_ids[i] = ids
+        
+        emotional = self._calculate_emotional_rewards([data.get('emotional_state') for data in batch])
+        engagement = self._calculate_engagements([data.get('user_engagement') for data in batch])
+        
+        return [
+            self._apply_reward(data, response_ids[i], emotional[i], engagement[i], record)
+            for i, data in enumerate(batch)
+        ]
+    
+    def _apply_reward(self, interaction_data, response_ids, emotional_reward=None, engagement_reward=None,
+                      record=True):
+        """Weight the reward components of one interaction and, if recording, update history and weights"""
         total_reward = 0.0
         rewards = {}
         
@@ -34,7 +147,9 @@ class RewardSystem:
         if 'response' in interaction_data:
             novelty_reward = self.reward_calculator.calculate_reward(
                 interaction_data['response'],
-                context=interaction_data.get('context')
+                context=interaction_data.get('context'),
+                input_ids=response_ids,
+                record=record
             )
             rewards['novelty'] = novelty_reward * self.weights['novelty']
         
@@ -42,22 +157,25 @@ class RewardSystem:
         if 'context' in interaction_data and 'response' in interaction_data:
             coherence_reward = self._calculate_coherence(
                 interaction_data['context'],
-                interaction_data['response']
+                interaction_data['response'],
+                response_ids
             )
             rewards['coherence'] = coherence_reward * self.weights['coherence']
         
         # Calculate emotional reward
         if 'emotional_state' in interaction_data:
-            emotional_reward = self._calculate_emotional_reward(
-                interaction_data['emotional_state']
-            )
+            if emotional_reward is None:
+                emotional_reward = self._calculate_emotional_reward(
+                    interaction_data['emotional_state']
+                )
             rewards['emotional'] = emotional_reward * self.weights['emotional']
         
         # Calculate engagement reward
         if 'user_engagement' in interaction_data:
-            engagement_reward = self._calculate_engagement(
-                interaction_data['user_engagement']
-            )
+            if engagement_reward is None:
+                engagement_reward = self._calculate_engagement(
+                    interaction_data['user_engagement']
+                )
             rewards['engagement'] = engagement_reward * self.weights['engagement']
         
         # Calculate learning reward
@@ -70,22 +188,20 @@ class RewardSystem:
         # Calculate total reward
         total_reward = sum(rewards.values())
         
-        # Store reward in history
-        self.reward_history.append({
-            'total': total_reward,
-            'components': rewards
-        })
-        
-        # Adjust weights based on reward history
-        self._adjust_weights()
+        if record:
+            # Store reward in history
+            self.reward_history.append(total_reward, rewards)
+            
+            # Adjust weights based on reward history
+            self._adjust_weights()
         
         return total_reward, rewards
     
-    def _calculate_coherence(self, context, response):
+    def _calculate_coherence(self, context, response, response_ids=None):
         """Calculate coherence between context and response"""
         # Use pattern recognition to check if response follows learned patterns
         coherence_score = self.reward_calculator._calculate_pattern_match(
-            response, context
+            response, context, response_ids
         )
         return coherence_score
     
@@ -101,6 +217,51 @@ class RewardSystem:
         
         return normalized_entropy
     
+    def _calculate_emotional_rewards(self, emotional_states):
+        """Normalized emotional entropy for many states at once (None where absent)"""
+        present = [i for i, state in enumerate(emotional_states) if state is not None]
+        results = [None] * len(emotional_states)
+        if not present:
+            return results
+        
+        # Pad the states into one matrix; padding contributes nothing to the entropy
+        lengths = np.array([len(emotional_states[i]) for i in present])
+        values = np.zeros((len(present), lengths.max()))
+        for row, i in enumerate(present):
+            values[row, :lengths[row]] = list(emotional_states[i].values())
+        mask = np.arange(values.shape[1]) < lengths[:, None]
+        
+        entropy = -np.sum(np.where(mask, values * np.log(values + 1e-10), 0.0), axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            normalized_entropy = entropy / np.log(lengths)
+        
+        for row, i in enumerate(present):
+            results[i] = normalized_entropy[row]
+        return results
+    
+    def _calculate_engagements(self, engagement_records):
+        """Engagement rewards for many interactions at once (None where absent)"""
+        present = [i for i, record in enumerate(engagement_records) if record is not None]
+        results = [None] * len(engagement_records)
+        if not present:
+            return results
+        
+        def column(key):
+            return np.array([engagement_records[i].get(key, np.nan) for i in present], dtype=np.float64)
+        
+        response_time = column('response_time')
+        length = column('interaction_length')
+        initiative = column('user_initiative')
+        
+        engagement_scores = np.zeros(len(present))
+        engagement_scores += np.where(np.isnan(response_time), 0.0, 0.4 * np.exp(-response_time / 5.0))
+        engagement_scores += np.where(np.isnan(length), 0.0, 0.3 * np.minimum(length / 10.0, 1.0))
+        engagement_scores += np.where(np.isnan(initiative), 0.0, 0.3 * initiative)
+        
+        for row, i in enumerate(present):
+            results[i] = engagement_scores[row]
+        return results
+    
     def _calculate_engagement(self, engagement_data):
         """Calculate reward based on user engagement"""
         engagement_score = 0.0
@@ -141,14 +302,9 @@ class RewardSystem:
         if len(self.reward_history) < 10:
             return
         
-        # Look at last 10 interactions
-        recent_rewards = self.reward_history[-10:]
-        component_averages = {}
-        
-        # Calculate average reward for each component
-        for component in self.weights.keys():
-            values = [r['components'].get(component, 0) for r in recent_rewards]
-            component_averages[component] = np.mean(values)
+        # Average reward for each component over the last 10 interactions
+        averages = self.reward_history.window_mean(10)
+        component_averages = dict(zip(self.reward_history.components, averages[1:].tolist()))
         
         # Adjust weights to favor more reliable reward components
         total_average = sum(component_averages.values())
@@ -182,17 +338,19 @@ class RewardSystem:
     
     def get_reward_summary(self):
         """Get summary of reward history"""
-        if not self.reward_history:
+        if not len(self.reward_history):
             return None
-            
-        recent_rewards = self.reward_history[-50:]  # Last 50 interactions
+        
+        recent_totals = self.reward_history.recent(6)[:, 0]
         
         return {
-            'average_reward': np.mean([r['total'] for r in recent_rewards]),
-            'reward_trend': np.diff([r['total'] for r in recent_rewards])[-5:].tolist(),
+            'average_reward': self.reward_history.window_mean(50)[0],  # Last 50 interactions
+            'reward_trend': np.diff(recent_totals).tolist(),
             'component_weights': self.weights,
             'recent_levels': [
-                self.get_reward_level(r['total'])
-                for r in recent_rewards[-5:]
-            ]
+                self.get_reward_level(total)
+                for total in recent_totals[-5:]
+            ],
+            'running_mean': self.reward_history.component_dict(self.reward_history.ewm_mean),
+            'running_std': self.reward_history.component_dict(np.sqrt(self.reward_history.ewm_var))
         }
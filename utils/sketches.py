@@ -0,0 +1,108 @@
+import zlib
+import numpy as np
+from config.settings import SKETCH_WIDTH, SKETCH_DEPTH
+
+class CountMinSketch:
+    """
+    Approximate frequency counts in fixed memory.
+    Every key increments one counter per row; the smallest of its counters is
+    an overestimate of the true count that is exact when there are no collisions.
+    """
+    PRIME = (1 << 31) - 1
+
+    def __init__(self, width=SKETCH_WIDTH, depth=SKETCH_DEPTH, seed=0):
+        self.width = width
+        self.table = np.zeros((depth, width), dtype=np.int64)
+        self._rows = np.arange(depth)
+
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, self.PRIME, depth, dtype=np.uint64)
+        self._b = rng.integers(0, self.PRIME, depth, dtype=np.uint64)
+
+    @staticmethod
+    def _hash(key):
+        # Stable across processes (str hash() is salted), so pickled sketches stay valid
+        if isinstance(key, str):
+            key = key.encode('utf-8')
+        elif not isinstance(key, bytes):
+            key = repr(key).encode('utf-8')
+        return zlib.crc32(key)
+
+    def _columns(self, key):
+        h = np.uint64(self._hash(key) % self.PRIME)
+        return ((self._a * h + self._b) % np.uint64(self.PRIME) % np.uint64(self.width)).astype(np.int64)
+
+    def add(self, key, count=1):
+        """Add occurrences of a key"""
+        self.table[self._rows, self._columns(key)] += count
+
+    def estimate(self, key):
+        """Estimated number of occurrences of a key"""
+        return int(self.table[self._rows, self._columns(key)].min())
+
+class SpaceSaving:
+    """
+    Space-Saving top-k heavy hitters with O(1) updates.
+    At most `capacity` keys are monitored. Keys are grouped into buckets by
+    count; a new key replaces one from the lowest bucket and inherits its count
+    as the overestimation error.
+    """
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.counts = {}  # Monitored key -> (over)estimated count
+        self.errors = {}  # Monitored key -> maximum overestimation
+        self._buckets = {}  # Count -> keys with that count, oldest first
+        self._min_count = 0
+
+    def __contains__(self, key):
+        return key in self.counts
+
+    def __len__(self):
+        return len(self.counts)
+
+    def increment(self, key):
+        """
+        Count one occurrence of a key
+        Returns the key evicted to make room for it, if any
+        """
+        if key in self.counts:
+            count = self.counts[key]
+            self._move(key, count, count + 1)
+            return None
+
+        evicted = None
+        if len(self.counts) < self.capacity:
+            count, error = 0, 0
+            self._min_count = 1
+        else:
+            count = error = self._min_count
+            evicted = next(iter(self._buckets[count]))
+            self._detach(evicted, count)
+            del self.counts[evicted]
+            del self.errors[evicted]
+
+        self.errors[key] = error
+        self._attach(key, count + 1)
+        return evicted
+
+    def top(self, n=None):
+        """Monitored keys with their counts, most frequent first"""
+        ranked = sorted(self.counts.items(), key=lambda item: item[1], reverse=True)
+        return ranked if n is None else ranked[:n]
+
+    def _move(self, key, old_count, new_count):
+        self._detach(key, old_count)
+        self._attach(key, new_count)
+
+    def _attach(self, key, count):
+        self.counts[key] = count
+        self._buckets.setdefault(count, {})[key] = None
+
+    def _detach(self, key, count):
+        bucket = self._buckets[count]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[count]
+            # Counts only grow by one, so the next lowest bucket is count + 1
+            if count == self._min_count:
+                self._min_count = count + 1